@@ -118,6 +118,52 @@ class SoundManager:
                 self.unregister_sound(sound)
 
 
+class NullSound:
+    """What `NullSoundManager` hands out in place of a playing sound"""
+
+    def __init__(self, path):
+        self.path = path
+        self.on_finish = None
+
+    def play(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+class NullSoundManager(SoundManager):
+    """Plays nothing, for running without an audio device. Sounds finish on the next update, so anything waiting on them carries on at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(None, None, **kwargs)
+        self._position = (0, 0, 0)
+        # Paths of every sound asked for, in order
+        self.played = []
+
+    @property
+    def position(self):
+        return self._position
+
+    def play(self, path, stream=False, **kwargs):
+        sound = NullSound(path)
+        self.played.append(path)
+        self.register_sound(sound)
+        return sound
+
+    def set_position(self, position):
+        self._position = tuple(position)
+
+    def update(self):
+        for sound in self.sounds.copy():
+            if sound.on_finish:
+                sound.on_finish()
+            self.unregister_sound(sound)
+
+
 class Sound:
     def __init__(self, synthizer_context, generator, buffer=None, **kwargs):
         self.synthizer_context = synthizer_context
@@ -261,6 +307,9 @@ class Sound:
 
 
 class BlockingSound(Screen):
+    # Waits on the sound's end, which `SoundManager.update` picks up
+    update_rate = None
+
     def __init__(self, sound, skippable=False, callback=None):
         Screen.__init__(self)
         self.sound = sound
@@ -0,0 +1,2 @@
+"""Standalone scripts for measuring the hot paths of the arcade.
+Each module is meant to be ran from the src directory, like so: `python -m benchmarks.word_db`"""
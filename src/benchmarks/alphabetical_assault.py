@@ -0,0 +1,43 @@
+import random
+import sys
+import timeit
+
+from games.alphabetical_assault import AlphabeticalAssaultObs
+from word_db import BACKEND_INDEX, WordDB
+
+DEFAULT_DB_PATH = "data/games/word_list.db"
+GRID_SIZES = 6, 10, 15, 20, 25, 30
+# Roughly how full the grid is when letters land mid-game
+FILL_RATIO = 0.7
+
+
+def make_observer(word_db, size):
+    obs = AlphabeticalAssaultObs(size, size)
+    obs.prefix_index = word_db.fetch_prefix_index()
+    for x in range(size):
+        for y in range(size):
+            if random.random() < FILL_RATIO:
+                obs.set_tile((x, y), random.choice(obs.bag))
+    return obs
+
+
+def bench_landing(db_path, number=200):
+    print("Word search per landing, microseconds per call")
+    word_db = WordDB(BACKEND_INDEX)
+    word_db.load(db_path)
+    for size in GRID_SIZES:
+        obs = make_observer(word_db, size)
+        # Landings always happen on an occupied tile
+        filled = [
+            (x, y) for x in range(size) for y in range(size) if obs.fetch_letter((x, y))
+        ]
+        positions = [random.choice(filled) for _ in range(number)]
+        elapsed = timeit.timeit(
+            lambda: [obs.find_longest_word(p) for p in positions], number=1
+        )
+        print("  %sx%s: %.1f" % (size, size, elapsed / number * 1e6))
+    word_db.close()
+
+
+if __name__ == "__main__":
+    bench_landing(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH)
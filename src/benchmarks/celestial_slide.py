@@ -0,0 +1,76 @@
+import random
+import sys
+import time
+
+from games.grid_game import DIRECTIONS, fetch_neighbour_table
+from games.slide_solver import PatternDatabase, SlideSolver, fetch_goal, make_solvable
+
+# Tile groups for the 4x4 pattern database, one table per group
+PATTERN_GROUPS = (1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15)
+
+
+def fetch_scrambled(width, height, moves):
+    """Random walks of the blank keep 4x4 boards within reach, whereas a full shuffle can take Python minutes to solve"""
+    cells = fetch_goal(width, height)
+    neighbours = fetch_neighbour_table(width, height, DIRECTIONS)
+    blank = len(cells) - 1
+    for _ in range(moves):
+        n = random.choice(neighbours[blank])
+        cells[blank], cells[n] = cells[n], 0
+        blank = n
+    return cells
+
+
+def bench_solver(solver, boards):
+    nodes = 0
+    lengths = 0
+    elapsed = 0
+    worst = 0
+    for cells in boards:
+        start = time.perf_counter()
+        lengths += len(solver.solve(cells))
+        taken = time.perf_counter() - start
+        elapsed += taken
+        worst = max(worst, taken)
+        nodes += solver.nodes
+    print(
+        "    moves %.1f, nodes %d, nodes/s %d, ms per board %.1f, worst ms %.1f"
+        % (
+            lengths / len(boards),
+            nodes / len(boards),
+            nodes / elapsed,
+            elapsed / len(boards) * 1e3,
+            worst * 1e3,
+        )
+    )
+
+
+def bench_3x3(boards=50):
+    print("3x3, fully shuffled")
+    order = list(range(9))
+    shuffled = []
+    for _ in range(boards):
+        random.shuffle(order)
+        shuffled.append(make_solvable(order, 3))
+    print("  Manhattan and linear conflicts")
+    bench_solver(SlideSolver(3, 3), shuffled)
+
+
+def bench_4x4(boards=10, moves=80):
+    print("4x4, scrambled by %d random moves" % moves)
+    scrambled = [fetch_scrambled(4, 4, moves) for _ in range(boards)]
+    print("  Manhattan and linear conflicts")
+    bench_solver(SlideSolver(4, 4), scrambled)
+    database = PatternDatabase(4, 4, PATTERN_GROUPS)
+    database.build()
+    print(
+        "  Pattern database, built in %.1f s, %d bytes"
+        % (database.build_time, sum(len(t) for t in database.tables))
+    )
+    bench_solver(SlideSolver(4, 4, database), scrambled)
+
+
+if __name__ == "__main__":
+    random.seed(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    bench_3x3()
+    bench_4x4()
@@ -0,0 +1,112 @@
+import random
+import sys
+import timeit
+
+from games.grid_game import EVT_SCROLL, LEFT, RIGHT, GridGame, GridGameObserver
+from games.observable_game import EVT_GAME_UPDATE, GameObserver
+
+
+def fetch_by_name(observer, attr, variation):
+    """How handlers used to be found, building names and probing the instance on every event"""
+    variation = variation.lower().replace(" ", "_")
+    func_list = []
+    if len(variation) > 0:
+        attr_var_name = f"handle_{variation}_{attr}"
+        if hasattr(observer, attr_var_name):
+            func_list.append(getattr(observer, attr_var_name))
+    attr_name = f"handle_{attr}"
+    if hasattr(observer, attr_name):
+        func_list.append(getattr(observer, attr_name))
+    if len(func_list) == 0:
+        return [observer.handle_event]
+    return func_list
+
+
+def notify_by_name(observer, event_type, *args, **kwargs):
+    context = kwargs.pop("game", None)
+    for f in fetch_by_name(observer, event_type, kwargs.get("variation", "")):
+        if not f(context, *args, **kwargs):
+            break
+
+
+class BenchObserver(GameObserver):
+    def handle_frame_update(self, game, *args, **kwargs):
+        pass
+
+    def handle_partial_submit(self, game, *args, **kwargs):
+        return True
+
+    def handle_submit(self, game, *args, **kwargs):
+        pass
+
+
+# (label, event type, variation), I.e, a plain handler, a variation handler falling through to the plain one, and the fallback
+CASES = (
+    ("frame update", EVT_GAME_UPDATE, "Standard"),
+    ("variation chain", "submit", "Partial"),
+    ("fallback", "unhandled", "Standard"),
+)
+
+
+def bench_dispatch(number=200000):
+    print("Dispatch overhead per event, ns")
+    print("  event: by name, cached table")
+    observer = BenchObserver()
+    for label, event, variation in CASES:
+        before = timeit.timeit(
+            lambda: notify_by_name(
+                observer, event, variation=variation, difficulty=1, game=None
+            ),
+            number=number,
+        )
+        after = timeit.timeit(
+            lambda: observer.notify(
+                event, variation=variation, difficulty=1, game=None
+            ),
+            number=number,
+        )
+        print("  %s: %.0f, %.0f" % (label, before / number * 1e9, after / number * 1e9))
+
+
+class ScrollObserver(GridGameObserver):
+    def handle_grid_scroll(self, game, direction, *args, **kwargs):
+        self.scrolls = getattr(self, "scrolls", 0) + 1
+        return super().handle_grid_scroll(game, direction, *args, **kwargs)
+
+
+def bench_event_queue(frames=600, max_burst=6):
+    """Replays bursts of scrolls, as key repeat produces, with and without coalescing"""
+    print(
+        "Queued grid events over %d frames, bursts of up to %d scrolls"
+        % (frames, max_burst)
+    )
+    print("  coalescing: scrolls handled, max events per frame, max drain us")
+    bursts = [
+        [random.choice((LEFT, RIGHT))] * random.randint(0, max_burst)
+        for _ in range(frames)
+    ]
+    for coalesced in frozenset((EVT_SCROLL,)), frozenset():
+        game = GridGame("Standard", 1)
+        game.defer_events = True
+        game.coalesced_events = coalesced
+        observer = ScrollObserver()
+        game.add_observer(observer)
+        for burst in bursts:
+            for direction in burst:
+                game.send_notification(EVT_SCROLL, direction=direction)
+            game.update(1 / 60, False)
+        stats = game.fetch_event_stats()
+        print(
+            "  %s: %d, %d, %.1f"
+            % (
+                "on" if coalesced else "off",
+                getattr(observer, "scrolls", 0),
+                stats["max_events_per_frame"],
+                stats["max_drain_time"] * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    bench_dispatch(*(int(n) for n in sys.argv[1:]))
+    bench_event_queue()
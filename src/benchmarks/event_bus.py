@@ -0,0 +1,84 @@
+import random
+import sys
+import time
+
+from observer import Observer, Subject
+
+
+class ListSubject:
+    """How subjects used to keep observers, I.e, a plain list per event"""
+
+    def __init__(self):
+        self.observers = {}
+
+    def add_observer(self, event, obs):
+        self.observers.setdefault(event, []).append(obs)
+
+    def remove_observer(self, event, obs):
+        if event not in self.observers or obs not in self.observers[event]:
+            return False
+        self.observers[event].remove(obs)
+        return True
+
+    def notify(self, event_type, *args, **kwargs):
+        for o in self.observers.get(event_type, ()):
+            o.notify(event_type, *args, **kwargs)
+
+
+class BenchObserver(Observer):
+    def handle_tick(self, *args, **kwargs):
+        pass
+
+    def handle_key(self, *args, **kwargs):
+        pass
+
+
+EVENTS = "tick", "key", "resize", "focus"
+
+
+def subscribe(subject, observers):
+    for i, o in enumerate(observers):
+        subject.add_observer(EVENTS[i % len(EVENTS)], o)
+
+
+def bench_notify(subscribers, seconds=1, rate=10000):
+    """Sends `rate` events a second for `seconds`, returning the share of the time spent dispatching"""
+    observers = [BenchObserver() for _ in range(subscribers)]
+    results = []
+    for subject in ListSubject(), Subject():
+        subscribe(subject, observers)
+        events = [random.choice(EVENTS) for _ in range(rate * seconds)]
+        start = time.perf_counter()
+        for e in events:
+            subject.notify(e)
+        results.append((time.perf_counter() - start) / seconds)
+    return results
+
+
+def bench_churn(subscribers, rounds=2000):
+    """Unsubscribing and resubscribing random observers, as screens come and go"""
+    observers = [BenchObserver() for _ in range(subscribers)]
+    results = []
+    for subject in ListSubject(), Subject():
+        for o in observers:
+            subject.add_observer("tick", o)
+        picks = [random.choice(observers) for _ in range(rounds)]
+        start = time.perf_counter()
+        for o in picks:
+            subject.remove_observer("tick", o)
+            subject.add_observer("tick", o)
+        results.append((time.perf_counter() - start) / rounds * 1e6)
+    return results
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    counts = [int(n) for n in sys.argv[1:]] or [100, 300, 1000]
+    print("Dispatching 10000 events a second, share of each second spent")
+    print("  subscribers: lists, event bus")
+    for n in counts:
+        print("  %d: %.2f, %.2f" % (n, *bench_notify(n)))
+    print("Unsubscribing and resubscribing, us per pair")
+    print("  subscribers: lists, event bus")
+    for n in counts:
+        print("  %d: %.2f, %.2f" % (n, *bench_churn(n)))
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+import pygame
+from screen import FRAME_RATE, Screen
+from screen_manager import ScreenManager
+
+
+class IdleScreen(Screen):
+    """Stands in for a menu nobody is touching"""
+
+    update_rate = None
+
+
+class AnimatedScreen(Screen):
+    """Stands in for a real-time game"""
+
+
+def run_loop(sm, seconds, paced):
+    """Returns the share of one core the loop used"""
+    clock = pygame.time.Clock()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    updates = 0
+    while time.perf_counter() - start < seconds:
+        if paced:
+            delta = sm.wait(clock)
+        else:
+            # How the loop used to run, whatever was on screen
+            delta = clock.tick(FRAME_RATE) / 1000
+        sm.update(delta)
+        updates += 1
+    elapsed = time.perf_counter() - start
+    return (time.process_time() - cpu_start) / elapsed, updates / elapsed
+
+
+def bench_pacing(seconds=3):
+    print("CPU use over %s seconds, share of one core" % seconds)
+    print("  screen: fixed tick, paced (updates per second)")
+    for screen_cls in IdleScreen, AnimatedScreen:
+        results = []
+        for paced in False, True:
+            sm = ScreenManager()
+            sm.add_screen(screen_cls())
+            results.extend(run_loop(sm, seconds, paced))
+        print("  %s: %.3f (%.0f), %.3f (%.0f)" % (screen_cls.__name__, *results))
+
+
+if __name__ == "__main__":
+    pygame.init()
+    pygame.display.set_mode((720, 480))
+    bench_pacing(*(float(n) for n in sys.argv[1:]))
+    pygame.quit()
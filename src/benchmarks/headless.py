@@ -0,0 +1,80 @@
+import random
+import sys
+import time
+
+from context import WORD_DB_PATH
+from file_manager import FileManager
+from headless import run
+from screen import FRAME_RATE
+
+# From the main menu to an easy game of CelestialSlide, with a frame between keys for screens to settle
+OPENING = ["return", "down", "down", "return", "return", "return", "return", "wait 2"]
+# Quitting the game and backing out of every menu
+CLOSING = ["wait 2", "escape", "wait 2", "return", "wait 2"] + ["escape", ""] * 3
+MOVES = "left", "right", "up", "down"
+# The hint is answered by the solver thread whenever it is done, so replays may place or word it differently
+HINT_ANSWERS = "Slide ", "No hint found in time", "Solved, press enter"
+
+
+def fetch_session(moves):
+    """A player wandering the board and sliding planets at random, asking for a hint at the start.
+    Hints run the solver, which would otherwise dominate the time of the session
+    """
+    script = list(OPENING) + ["h"]
+    for _ in range(moves):
+        if random.random() < 0.5:
+            script.append("left shift+%s" % random.choice(MOVES))
+        else:
+            script.append(random.choice(MOVES))
+    return script + CLOSING
+
+
+def fetch_transcript(ctx):
+    return [
+        n for n in ctx.spm.output_method.transcript if not n[0].startswith(HINT_ANSWERS)
+    ]
+
+
+def bench_sessions(sessions=5, moves=20000):
+    # An empty script quits at once, which leaves the time spent loading resources
+    start = time.perf_counter()
+    run([])
+    startup = time.perf_counter() - start
+    print("Scripted CelestialSlide sessions of %d moves each" % moves)
+    print("  startup, I.e, loading resources: %.2f seconds" % startup)
+    print(
+        "  session: frames, simulated seconds, wall seconds, times faster than real time once started"
+    )
+    transcripts = []
+    for i in range(sessions):
+        random.seed(i)
+        script = fetch_session(moves)
+        start = time.perf_counter()
+        ctx, frames = run(script, seed=i)
+        elapsed = time.perf_counter() - start
+        transcripts.append(fetch_transcript(ctx))
+        print(
+            "  %d: %d, %.1f, %.2f, %.0f"
+            % (
+                i,
+                frames,
+                frames / FRAME_RATE,
+                elapsed,
+                frames / FRAME_RATE / max(elapsed - startup, 1e-9),
+            )
+        )
+    # Same script and seed, same session, save for when the hint lands
+    random.seed(0)
+    ctx, _ = run(fetch_session(moves), seed=0)
+    if fetch_transcript(ctx) != transcripts[0]:
+        raise ValueError("Replaying the same script and seed gave a different session")
+    print("  replay matches")
+
+
+if __name__ == "__main__":
+    if not FileManager().file_exists(WORD_DB_PATH):
+        raise ValueError(
+            'The word database, "%s", is missing. Build it with word_db_builder first'
+            % WORD_DB_PATH
+        )
+    bench_sessions(*(int(n) for n in sys.argv[1:]))
@@ -0,0 +1,81 @@
+import os
+import random
+import string
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+import pygame
+from games.text_game import TextGame, TextGameObserver
+from keyboard import Keyboard
+from screen import FRAME_RATE
+
+
+class FirstKeyKeyboard(Keyboard):
+    """How key presses used to be read, I.e, only the first of every frame"""
+
+    def update(self):
+        super().update()
+        self.keypress_events = self.keypress_events[:1]
+
+
+class TypedObserver(TextGameObserver):
+    def __init__(self):
+        super().__init__("^[a-z]$")
+
+
+def fetch_keystrokes(rate, seconds):
+    """Returns (time, character) pairs of someone typing `rate` characters a second, with the uneven rhythm of real typing"""
+    strokes = []
+    t = 0
+    while True:
+        t += random.expovariate(rate)
+        if t >= seconds:
+            return strokes
+        strokes.append((t, random.choice(string.ascii_lowercase)))
+
+
+def replay(keyboard_cls, strokes, seconds):
+    """Feeds the strokes through the event queue a frame at a time. Returns the text the game ended up with"""
+    keyboard = keyboard_cls()
+    game = TextGame("Standard", 1)
+    observer = TypedObserver()
+    game.add_observer(observer)
+    i = 0
+    for frame in range(int(seconds * FRAME_RATE) + 1):
+        frame_end = (frame + 1) / FRAME_RATE
+        while i < len(strokes) and strokes[i][0] < frame_end:
+            char = strokes[i][1]
+            pygame.event.post(
+                pygame.event.Event(
+                    pygame.KEYDOWN, key=ord(char), unicode=char, mod=0, scancode=0
+                )
+            )
+            i += 1
+        keyboard.update()
+        game.handle_input(1 / FRAME_RATE, keyboard)
+    return observer.text
+
+
+def bench_typing(seconds=10, rates=(30, 60, 120)):
+    print("Typing for %s seconds at %d frames per second" % (seconds, FRAME_RATE))
+    print("  characters per second: typed, kept by first key only, kept by queue")
+    for rate in rates:
+        strokes = fetch_keystrokes(rate, seconds)
+        typed = "".join(c for _, c in strokes)
+        first = replay(FirstKeyKeyboard, strokes, seconds)
+        queued = replay(Keyboard, strokes, seconds)
+        print("  %d: %d, %d, %d" % (rate, len(typed), len(first), len(queued)))
+        if queued != typed:
+            raise ValueError(
+                "The keyboard queue lost keystrokes at %d characters a second" % rate
+            )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((720, 480))
+    bench_typing(*(float(n) for n in sys.argv[1:]))
+    pygame.quit()
@@ -0,0 +1,168 @@
+import random
+import sys
+import time
+import timeit
+
+from games.grid_game import SURROUNDING, Grid
+from games.level_generator import LevelGenerator
+from games.minesweeper import MinesweeperObs, TileEnum, generate_solvable_layout
+from games.minesweeper_solver import MinesweeperSolver, fetch_set_bits
+
+BOARD_SIZES = 10, 50, 100, 250, 500
+
+
+def make_observer(size):
+    obs = MinesweeperObs()
+    obs.dimensions = (size, size)
+    obs.fill_grid()
+    return obs
+
+
+def count_by_walking(obs, layout, position):
+    """How counts used to be answered, walking the neighbours on every query"""
+    cnt = 0
+    for p in SURROUNDING:
+        new_pos = position[0] + p[0], position[1] + p[1]
+        if not obs.in_bounds(new_pos):
+            continue
+        if layout[obs.flatten(new_pos)] == TileEnum.mined:
+            cnt += 1
+    return cnt
+
+
+def bench_counts(number=2000):
+    print("Adjacent mine counts, per board size")
+    print("  size: fill_grid ms, count map ms, walk us/query, lookup us/query")
+    for size in BOARD_SIZES:
+        obs = make_observer(size)
+        fill = timeit.timeit(obs.fill_grid, number=1) * 1e3
+        layout = Grid.from_bitboard(*obs.dimensions, obs.mines, TileEnum.mined)
+        count_map = (
+            timeit.timeit(
+                lambda: layout.fetch_neighbour_counts(TileEnum.mined), number=1
+            )
+            * 1e3
+        )
+        positions = [
+            (random.randrange(size), random.randrange(size)) for _ in range(number)
+        ]
+        walk = (
+            timeit.timeit(
+                lambda: [count_by_walking(obs, layout, p) for p in positions], number=1
+            )
+            / number
+            * 1e6
+        )
+
+        def lookup_all():
+            for p in positions:
+                obs.position = p
+                obs.fetch_adjacent_empty_tile_count()
+
+        lookup = timeit.timeit(lookup_all, number=1) / number * 1e6
+        print(
+            "  %sx%s: %.2f, %.2f, %.2f, %.2f"
+            % (size, size, fill, count_map, walk, lookup)
+        )
+
+
+def bench_memory(marked_ratio=0.1):
+    print("Level state, bytes per tile")
+    print("  size: enum list and marked set, bitboards, count map")
+    for size in BOARD_SIZES:
+        obs = make_observer(size)
+        tiles = size * size
+        marked = random.sample(range(tiles), int(tiles * marked_ratio))
+        # Setting bits one at a time copies the whole int each time, so we go through a grid
+        layer = Grid(size, size)
+        for i in marked:
+            layer[i] = 1
+        obs.marked = layer.fetch_bitboard(1)
+        # The previous representation, I.e, a list of shared enum members plus a set of marked indices
+        enums = [TileEnum(t) for t in Grid.from_bitboard(size, size, obs.mines, 2)]
+        # Set entries are ints of their own, which count too
+        enum_size = (
+            sys.getsizeof(enums)
+            + sys.getsizeof(set(marked))
+            + sum(sys.getsizeof(i) for i in marked)
+        )
+        bitboard_size = sum(sys.getsizeof(b) for b in (obs.mines, obs.seen, obs.marked))
+        count_map_size = sys.getsizeof(obs.mine_counts.cells)
+        print(
+            "  %sx%s: %.2f, %.2f, %.2f"
+            % (
+                size,
+                size,
+                enum_size / tiles,
+                bitboard_size / tiles,
+                count_map_size / tiles,
+            )
+        )
+
+
+def bench_cascade(mine_density=0.05):
+    print("Cascade reveal from an empty tile, on sparse boards")
+    print("  size: tiles revealed, ms")
+    for size in BOARD_SIZES:
+        obs = MinesweeperObs()
+        obs.dimensions = (size, size)
+        obs.mine_density = mine_density
+        obs.reveal_density = 0
+        obs.fill_grid()
+        # This sparse, most empty tiles join into one large region, which is the case players would hate to reveal by hand
+        # A few random picks are enough to land in it
+        zeros = [i for i in range(size * size) if not obs.mine_counts[i]]
+        start = max(
+            random.sample(zeros, min(5, len(zeros))),
+            key=lambda i: obs.fetch_cascade(i).bit_count(),
+        )
+        revealed = obs.fetch_cascade(start).bit_count()
+        elapsed = timeit.timeit(lambda: obs.fetch_cascade(start), number=1) * 1e3
+        print("  %sx%s: %d, %.2f" % (size, size, revealed, elapsed))
+
+
+def bench_solver(boards=50, sizes=(7, 10, 15, 20, 30), budget=0.5):
+    print("Solving boards from their starting reveals, at the starting densities")
+    print("  size: boards per second, share finished without guessing")
+    for size in sizes:
+        obs = make_observer(size)
+        solved = 0
+        elapsed = 0
+        for _ in range(boards):
+            obs.fill_grid()
+            solver = MinesweeperSolver(size, size, obs.mine_counts)
+            start = time.perf_counter()
+            solved += solver.solve_fully(
+                fetch_set_bits(obs.seen),
+                size * size - obs.mines.bit_count(),
+                start + budget,
+            )
+            elapsed += time.perf_counter() - start
+        print("  %sx%s: %.1f, %.2f" % (size, size, boards / elapsed, solved / boards))
+
+
+def bench_generation(levels=12, seconds_per_level=2):
+    print(
+        "Generating boards that need no guessing, with a level cleared every %s seconds"
+        % seconds_per_level
+    )
+    obs = make_observer(7)
+    obs.generator = LevelGenerator(generate_solvable_layout, depth=1)
+    obs.generator.start()
+    obs.plan_levels()
+    for _ in range(levels):
+        time.sleep(seconds_per_level)
+        obs.advance_level()
+    stats = obs.generator.fetch_stats()
+    obs.run_cleanup(None)
+    print("  final size: %sx%s" % obs.dimensions)
+    for k, v in stats.items():
+        print("  %s: %s" % (k, round(v, 3)))
+
+
+if __name__ == "__main__":
+    bench_counts(*(int(n) for n in sys.argv[1:]))
+    bench_memory()
+    bench_cascade()
+    bench_solver()
+    bench_generation()
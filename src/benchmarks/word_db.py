@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import time
+import timeit
+
+from word_db import BACKEND_PACKED, BACKEND_SQLITE, BACKENDS, WordDB
+from word_db_builder import fetch_packed_path, fetch_query_plans
+
+DEFAULT_DB_PATH = "data/games/word_list.db"
+# The (lower_bound, upper_bound, limit, is_unique) combinations the games ask for
+SAMPLING_CASES = (
+    (3, 7, 1, False),
+    (3, 6, 8, False),
+    (4, 8, 1, False),
+    (5, 5, 1, True),
+    (8, 15, 1, True),
+)
+
+
+def time_call(func, number):
+    """Returns the average time of a single call in microseconds"""
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def fetch_backend_path(db_path, backend):
+    return fetch_packed_path(db_path) if backend == BACKEND_PACKED else db_path
+
+
+def fetch_rss():
+    """Returns the resident set size of this process in bytes, or 0 where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def measure_startup(backend, path):
+    """Meant to run in a fresh process, so that earlier loads don't skew the memory readings"""
+    rss = fetch_rss()
+    start = time.perf_counter()
+    word_db = WordDB(backend)
+    word_db.load(path)
+    elapsed = time.perf_counter() - start
+    # A bit of play, so that lazily mapped pages are accounted for
+    for w in word_db.fetch_random_words(3, 8, 500):
+        word_db.word_in_db(w)
+    return elapsed, fetch_rss() - rss
+
+
+def bench_startup(db_path):
+    print("Startup, seconds and resident memory gained")
+    context = multiprocessing.get_context("spawn")
+    for b in BACKENDS:
+        path = fetch_backend_path(db_path, b)
+        if not os.path.isfile(path):
+            print("  %s: %s does not exist" % (b, path))
+            continue
+        with context.Pool(1) as pool:
+            elapsed, rss = pool.apply(measure_startup, (b, path))
+        print("  %s: %.3f; %.2f MB" % (b, elapsed, rss / 1024 ** 2))
+
+
+def bench_random_sampling(db_path, number=200):
+    print("Random sampling, microseconds per call")
+    connection = sqlite3.connect(db_path)
+    cursor = connection.cursor()
+    dbs = {}
+    for b in BACKENDS:
+        path = fetch_backend_path(db_path, b)
+        if os.path.isfile(path):
+            dbs[b] = WordDB(b)
+            dbs[b].load(path)
+    for lower_bound, upper_bound, limit, is_unique in SAMPLING_CASES:
+        # This is what `fetch_random_words` used to run
+        order_by_random = lambda: cursor.execute(
+            """SELECT name from words WHERE length BETWEEN (?) AND (?) AND is_unique = (?) ORDER BY RANDOM() LIMIT (?)""",
+            (lower_bound, upper_bound, int(is_unique), limit),
+        ).fetchall()
+        results = ["ORDER BY RANDOM(): %.1f" % time_call(order_by_random, number)]
+        for b, db in dbs.items():
+            results.append(
+                "%s: %.1f"
+                % (
+                    b,
+                    time_call(
+                        lambda: db.fetch_random_words(
+                            lower_bound, upper_bound, limit, is_unique
+                        ),
+                        number,
+                    ),
+                )
+            )
+        print(
+            "  %s-%s, limit %s, unique %s: %s"
+            % (lower_bound, upper_bound, limit, is_unique, "; ".join(results))
+        )
+    for db in dbs.values():
+        db.close()
+    connection.close()
+
+
+def bench_methods(db_path, number=200):
+    """Times every `WordDB` method against the sqlite backend and prints the query plans behind them.
+    Running this on a database before and after `word_db_builder` shows what the indexes buy us"""
+    print("%s, microseconds per call" % db_path)
+    word_db = WordDB(BACKEND_SQLITE)
+    print("  load: %.1f" % time_call(lambda: word_db.load(db_path), 1))
+    words = word_db.fetch_random_words(3, 8, 50)
+    candidates = words + ["".join(random.sample(w, len(w))) for w in words]
+    timings = {
+        "word_in_db": lambda: word_db.word_in_db(random.choice(candidates)),
+        "words_in_db": lambda: word_db.words_in_db(candidates),
+        "fetch_random_words": lambda: word_db.fetch_random_words(3, 6, 8),
+    }
+    if word_db.has_signatures():
+        timings["fetch_sub_anagrams"] = lambda: word_db.fetch_sub_anagrams(
+            "ingredients", 3
+        )
+    for method, func in timings.items():
+        print("  %s: %.1f" % (method, time_call(func, number)))
+    print("  fetch_prefix_index: %.1f" % time_call(word_db.fetch_prefix_index, 1))
+    for method, plan in fetch_query_plans(word_db.fetch_connection()).items():
+        print("  %s plan: %s" % (method, "; ".join(plan)))
+    word_db.close()
+
+
+if __name__ == "__main__":
+    # Pass several paths, E.G, a database before and after rebuilding, to compare their methods
+    db_paths = sys.argv[1:] if len(sys.argv) > 1 else [DEFAULT_DB_PATH]
+    bench_startup(db_paths[0])
+    bench_random_sampling(db_paths[0])
+    for path in db_paths:
+        bench_methods(path)
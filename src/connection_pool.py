@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+# Applied to every connection we open
+# The database is small and never written to at runtime, so we let sqlite map all of it
+MMAP_SIZE = 256 * 1024 ** 2
+# Negative values are in kibibytes rather than pages
+CACHE_SIZE = -8 * 1024
+
+
+class ConnectionPool:
+    """Hands every thread a read-only sqlite connection of its own, as connections may not be shared between threads.
+    Connections given back through `release_connection` are kept for the next thread that asks, up to `size` of them
+    """
+
+    def __init__(self, db_path, size=4):
+        # immutable tells sqlite nobody will write to the file, which lets it skip locking altogether
+        self.uri = "file:%s?mode=ro&immutable=1" % pathname2url(
+            os.path.abspath(db_path)
+        )
+        self.size = size
+        self.local = threading.local()
+        self.idle = []
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def open_connection(self):
+        # A released connection may be picked up by another thread, which is fine as long as one thread uses it at a time
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        connection.execute("""PRAGMA mmap_size = %d""" % MMAP_SIZE)
+        connection.execute("""PRAGMA cache_size = %d""" % CACHE_SIZE)
+        connection.execute("""PRAGMA query_only = 1""")
+        return connection
+
+    def fetch_connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            with self.lock:
+                if self.idle:
+                    connection = self.idle.pop()
+                else:
+                    connection = self.open_connection()
+                    self.connections.append(connection)
+            self.local.connection = connection
+        return connection
+
+    def release_connection(self):
+        """Gives the calling thread's connection back. Meant for worker threads that are about to finish"""
+        connection = self.local.__dict__.pop("connection", None)
+        if connection is None:
+            return
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(connection)
+                return
+            self.connections.remove(connection)
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            for c in self.connections:
+                c.close()
+            self.connections.clear()
+            self.idle.clear()
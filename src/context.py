@@ -6,25 +6,39 @@ from game_data_manager import GameDataManager
 from game_data_parser import GameDataParser
 from player import Player
 from speech_manager import SpeechManager
-from word_db import WordDB
+from word_db import BACKEND_PACKED, BACKEND_SQLITE, WordDB
 
 GAME_INFO_PATH = "data/games/info.json"
 PLAYER_SAVE_PATH = "data/save.json"
 WORD_DB_PATH = "data/games/word_list.db"
+# Written by `word_db_builder pack` and only used by the packed backend
+PACKED_WORD_LIST_PATH = "data/games/word_list.bin"
+# Swap to `BACKEND_INDEX` or `BACKEND_PACKED` to trade memory and startup time for lookup speed
+WORD_DB_BACKEND = BACKEND_SQLITE
+# Only consulted by the sqlite backend
+WORD_DB_CACHE_SIZE = 4096
 
 
 class Context:
     """A class mainly used as an injection method.
     Anything that states need to access on a persistent basis, such as a sound system, should probably go here"""
 
-    def __init__(self, file_mgr, snd_mgr):
+    def __init__(self, file_mgr, snd_mgr, speech_mgr=None):
         self.file_manager = file_mgr
         self.gdm = GameDataManager()
         self.player = Player()
-        self.spm = SpeechManager()
-        self.word_db = WordDB()
+        self.spm = speech_mgr if speech_mgr is not None else SpeechManager()
+        self.word_db = WordDB(WORD_DB_BACKEND, WORD_DB_CACHE_SIZE)
         self.sounds = snd_mgr
 
+    def fetch_word_db_stats(self):
+        """Gathers the word database counters for instrumentation purposes.
+        The cache counters are empty unless the default sqlite backend is in use, as the others answer from memory"""
+        return {
+            "cache": self.word_db.fetch_cache_stats(),
+            "prefetch": self.word_db.fetch_prefetch_stats(),
+        }
+
     def _dispatch_attrs_to_stats(self, arg_dict, stat_dict):
         """Upon load, recreate the objects in the save file"""
         dct = {}
@@ -50,7 +64,9 @@ class Context:
     def load_resources(self):
         """Used to load resources like word database and game information"""
         # Load db
-        self.word_db.load(WORD_DB_PATH)
+        self.word_db.load(
+            PACKED_WORD_LIST_PATH if WORD_DB_BACKEND == BACKEND_PACKED else WORD_DB_PATH
+        )
         initial_data = self.file_manager.fetch_json(GAME_INFO_PATH)
         # Data integrity check
         # We only parse data once
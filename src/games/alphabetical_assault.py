@@ -3,11 +3,13 @@ import random
 import pygame
 
 from .game_utils import Timer
-from .grid_game import GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
+from .grid_game import Grid, GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
 
 
 EVT_REPORT_ACTIVE_LETTER = "report_active_letter"
 EVT_REPORT_LETTERS_REMAINING = "report_letters_remaining"
+# Tiles hold lowercase ascii codes, so rows and columns can be searched as bytes
+EMPTY = ord(" ")
 
 
 class AlphabeticalAssault(GridGame):
@@ -24,8 +26,8 @@ class AlphabeticalAssault(GridGame):
 
 
 class AlphabeticalAssaultObs(GridGameObserver):
-    def __init__(self):
-        super().__init__(6, 6)
+    def __init__(self, length=6, width=6):
+        super().__init__(length, width)
         self.alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         self.letter_distributions = {
             "A": 9,
@@ -61,7 +63,10 @@ class AlphabeticalAssaultObs(GridGameObserver):
         random.shuffle(self.bag)
         self.active_letter = None
         self.last_landed_letter = None
-        self.grid = [[None] * self.dimensions[1] for i in range(self.dimensions[0])]
+        self.prefix_index = None
+        self.grid = Grid(*self.dimensions, EMPTY)
+        # Columns whose letters may be floating, settled upon the next frame
+        self.dirty_columns = set()
         self.letter_spawning_speed = 1
         self.minimum_word_length = 3
         self.letter_falling_speed = 1.25
@@ -80,19 +85,19 @@ class AlphabeticalAssaultObs(GridGameObserver):
 
     def handle_start(self, game, *args, **kwargs):
         self.game = game
+        # We build this now rather than upon the first landing to avoid a hitch mid-game
+        self.prefix_index = game.context.word_db.fetch_prefix_index()
         game.context.sounds.set_position(((self.dimensions[0] / 2) - 0.5, -0.5, 0))
         self.position = [0, self.dimensions[1] - 1]
         game.context.spm.output("Welcome!")
 
-    def in_bounds(self, position):
-        return not any(map(lambda x, y: x < 0 or x >= y, position, self.dimensions))
-
     def handle_grid_scroll(self, game, direction, *args, **kwargs):
         if not super().handle_grid_scroll(game, direction, *args, **kwargs):
             return False
         x, y = self.position
-        if self.grid[x][y]:
-            game.context.spm.output(f"{self.grid[x][y]}; {x+1}, {y+1}")
+        letter = self.fetch_letter(self.position)
+        if letter:
+            game.context.spm.output(f"{letter}; {x+1}, {y+1}")
         else:
             game.context.spm.output(f"Empty; {x+1}, {y+1}")
         game.play_from_dir("grid_scroll", position=(x, 0, y))
@@ -100,15 +105,11 @@ class AlphabeticalAssaultObs(GridGameObserver):
 
     def handle_slide(self, game, direction, *args, **kwargs):
         if self.active_letter and direction != UP:
-            direction = self.directions[direction]
-            destination = list(map(lambda x, y: x + y, self.active_letter, direction))
+            destination = list(self.move(self.active_letter, direction))
             if self.in_bounds(destination) and self.is_open(destination):
-                old_x, old_y = self.active_letter
                 new_x, new_y = destination
-                self.grid[old_x][old_y], self.grid[new_x][new_y] = (
-                    self.grid[new_x][new_y],
-                    self.grid[old_x][old_y],
-                )
+                self.dirty_columns.add(self.active_letter[0])
+                self.swap_tiles(self.active_letter, destination)
                 self.active_letter = destination
                 game.play_from_dir("slide", position=(new_x, 0, new_y))
                 game.context.spm.output(f"{new_x+1}, {new_y+1}")
@@ -116,22 +117,16 @@ class AlphabeticalAssaultObs(GridGameObserver):
     def handle_frame_update(self, game, delta, **kwargs):
         self.letter_spawning_timer.update(delta)
         self.letter_falling_timer.update(delta)
-        # loop through all of the letters and make sure they are grounded
-        for x in range(len(self.grid)):
-            for y in range(len(self.grid[x])):
-                if (
-                    self.grid[x][y]
-                    and [x, y] != self.active_letter
-                    and not self.is_grounded((x, y))
-                ):
-                    self.fall(
-                        (x, y)
-                    )  # if there's a floating letter on this tile of the grid that isn't our active letter, drop it down
+        # Letters can only end up floating where something was cleared or slid away, so those are the only columns we look at
+        while self.dirty_columns:
+            self.settle_column(self.dirty_columns.pop())
 
     def handle_report_active_letter(self, game, **kwargs):
         if self.active_letter:
             x, y = self.active_letter
-            game.context.spm.output(f"{self.grid[x][y]}; {x+1}, {y+1}")
+            game.context.spm.output(
+                f"{self.fetch_letter(self.active_letter)}; {x+1}, {y+1}"
+            )
 
     def handle_report_letters_remaining(self, game, **kwargs):
         game.context.spm.output(f"{len(self.bag)} letters remaining")
@@ -142,13 +137,13 @@ class AlphabeticalAssaultObs(GridGameObserver):
             []
         )  # figure out which tiles on the top row are empty so we can pick one at random
         for x in range(self.dimensions[0]):
-            if not self.grid[x][0]:  # if the tile is empty
+            if self.grid[x] == EMPTY:  # if the tile is empty
                 possible_locations.append([x, 0])  # Then we can consider using it
         if possible_locations:  # if there are valid choices to choose from
             location = random.choice(possible_locations)
             new_letter = self.bag.pop()
             self.active_letter = location
-            self.grid[location[0]][location[1]] = new_letter
+            self.set_tile(location, new_letter)
             self.game.play_from_dir("spawn", position=(location[0], 0, location[1]))
             self.game.context.spm.output(new_letter)
         else:
@@ -161,7 +156,7 @@ class AlphabeticalAssaultObs(GridGameObserver):
             self.game.play_from_dir(
                 "move",
                 position=(x, 0, y),
-                pitch_bend=1.5 - (y / len(self.grid[x]) + 0.5),
+                pitch_bend=1.5 - (y / self.dimensions[1] + 0.5),
             )
             self.active_letter[1] += 1
         else:
@@ -174,21 +169,37 @@ class AlphabeticalAssaultObs(GridGameObserver):
             if len(self.bag) <= 0:
                 self.set_win_state()
 
+    def fetch_letter(self, position):
+        """Returns the uppercase letter at the position, or `None` if the tile is empty"""
+        char = self.grid[self.flatten(position)]
+        return chr(char).upper() if char != EMPTY else None
+
+    def set_tile(self, position, letter):
+        self.grid[self.flatten(position)] = ord(letter.lower()) if letter else EMPTY
+
+    def swap_tiles(self, first, second):
+        self.grid.swap(self.flatten(first), self.flatten(second))
+
     def fall(self, position):
         x, y = position
-        self.grid[x][y], self.grid[x][y + 1] = self.grid[x][y + 1], self.grid[x][y]
+        self.swap_tiles((x, y), (x, y + 1))
+
+    def settle_column(self, x):
+        """Drops every letter of the column onto the ones below it in a single pass"""
+        # The active letter falls on its own timer, so we leave it and anything above it be
+        top = 0
+        if self.active_letter and self.active_letter[0] == x:
+            top = self.active_letter[1] + 1
+        letters = [c for c in self.grid.fetch_column(x)[top:] if c != EMPTY]
+        gap = self.dimensions[1] - top - len(letters)
+        self.grid.set_column(x, [EMPTY] * gap + letters, top)
 
     def is_grounded(self, position):
         x, y = position
         return not self.is_open((x, y + 1))
 
     def is_open(self, position):
-        x, y = position
-        if x < 0 or x >= self.dimensions[0]:
-            return False
-        if y < 0 or y >= self.dimensions[1]:
-            return False
-        return self.grid[x][y] == None
+        return self.in_bounds(position) and self.grid[self.flatten(position)] == EMPTY
 
     def clear_word(self):
         x, y = self.active_letter
@@ -197,47 +208,44 @@ class AlphabeticalAssaultObs(GridGameObserver):
             self.game.play_from_dir("good")
             self.game.context.spm.output(self.positions_to_string(word).lower())
             for position in word:
-                x, y = position
-                self.grid[x][y] = None
+                self.set_tile(position, None)
+                self.dirty_columns.add(position[0])
 
-    def longest_word_on_row(self, row):
-        longest_word = []
-        for i in range(self.minimum_word_length, len(self.grid)):
-            for j in range(0, len(self.grid) - i + 1):
-                positions = [[j + k, row] for k in range(i)]
-                word = self.positions_to_string(positions)
-                if (
-                    not " " in word
-                    and len(word) > len(longest_word)
-                    and self.game.context.word_db.word_in_db(word)
-                ):
-                    longest_word = positions
-        return longest_word
-
-    def longest_word_on_column(self, column):
-        longest_word = []
-        for i in range(self.minimum_word_length, len(self.grid[column])):
-            for j in range(0, len(self.grid[column]) - i + 1):
-                positions = [[column, j + k] for k in range(i)]
-                word = self.positions_to_string(positions)
-                if (
-                    not " " in word
-                    and len(word) > len(longest_word)
-                    and self.game.context.word_db.word_in_db(word.lower())
-                ):
-                    longest_word = positions
-        return longest_word
+    def fetch_longest_word_through(self, line, index, to_position):
+        """Returns the positions of the longest word on the line buffer that covers `index`.
+        `to_position` turns an offset along the line back into a grid position"""
+        # Words never span empty tiles, so only the run of letters around `index` matters
+        start = line.rfind(b" ", 0, index) + 1
+        end = line.find(b" ", index)
+        if end == -1:
+            end = len(line)
+        if end - start < self.minimum_word_length:
+            return []
+        run = line[start:end].decode("ascii")
+        offset = index - start
+        longest, longest_start = 0, 0
+        for s in range(offset + 1):
+            length = self.prefix_index.longest_match(run, s)
+            # If the longest word starting at `s` stops short of `index`, every shorter one does too
+            if length >= self.minimum_word_length and s + length > offset:
+                if length > longest:
+                    longest, longest_start = length, s
+        return [to_position(start + longest_start + i) for i in range(longest)]
 
     def positions_to_string(self, positions):
-        string = ""
-        for position in positions:
-            x, y = position
-            string += self.grid[x][y] if self.grid[x][y] else " "
-        return string
+        return "".join(chr(self.grid[self.flatten(p)]) for p in positions).upper()
 
     def find_longest_word(self, position):
         x, y = position
-        results = (self.longest_word_on_row(y), self.longest_word_on_column(x))
+        # Only words containing the landed tile are new, so we only look at windows covering it
+        results = (
+            self.fetch_longest_word_through(
+                self.grid.fetch_row(y).tobytes(), x, lambda i: [i, y]
+            ),
+            self.fetch_longest_word_through(
+                self.grid.fetch_column(x).tobytes(), y, lambda i: [x, i]
+            ),
+        )
         word = max(results, key=lambda x: len(x))
         return word if word else None
 
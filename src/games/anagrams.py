@@ -27,14 +27,27 @@ class AnagramsObs(TextInputObserver):
         self.anagram_word = ""
         self.letter_counts = None
         self.entered_anagrams = set()
+        # Every valid answer, known from the start so that guesses are a set lookup
+        self.anagrams = set()
         self.game_timer = None
 
     def handle_start(self, game, *args, **kwargs):
         super().handle_start(game, *args, **kwargs)
         self.anagram_word = game.context.word_db.fetch_random_word(8, 15, True)
         self.letter_counts = Counter(self.anagram_word)
+        self.anagrams = game.context.word_db.fetch_sub_anagrams(
+            self.anagram_word, MINIMUM_WORD_LENGTH
+        )
+        self.anagrams.discard(self.anagram_word)
         self.game_timer = Timer(self.set_win_state, 60)
-        game.context.spm.output("Your word is: %s" % self.anagram_word)
+        game.context.spm.output(
+            "Your word is: %s. There are %d words to find"
+            % (self.anagram_word, len(self.anagrams))
+        )
+
+    @property
+    def words_remaining(self):
+        return len(self.anagrams) - len(self.entered_anagrams)
 
     def is_char_matching(self, char):
         return super().is_char_matching(char) and self.text.count(
@@ -53,13 +66,18 @@ class AnagramsObs(TextInputObserver):
         elif self.text in self.entered_anagrams:
             game.context.spm.output("You already guessed that")
         else:
-            if not game.context.word_db.word_in_db(self.text):
+            if self.text not in self.anagrams:
                 game.context.spm.output("Your anagram needs to be a valid word")
             else:
                 self.entered_anagrams.add(self.text)
                 # We subtract to add time
                 self.game_timer.add_time(-3)
-                game.context.spm.output("Next?")
+                if self.words_remaining == 0:
+                    self.set_win_state()
+                else:
+                    game.context.spm.output(
+                        "Next? %d words remaining" % self.words_remaining
+                    )
 
         self.clear_text()
         return False
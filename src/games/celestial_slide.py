@@ -1,7 +1,20 @@
+import queue
 import random
+import threading
+import time
+
 import pygame
 
-from .grid_game import GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
+from .grid_game import Grid, GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
+from .slide_solver import SlideSolver, make_solvable
+
+EVT_HINT = "hint"
+# What the solver thread was asked to do, so its answer lands in the right place
+SOLVE_START = "start"
+SOLVE_HINT = "hint"
+# How long the solver may think before giving up on a hint
+HINT_TIME_BUDGET = 0.5
+DIRECTION_NAMES = {LEFT: "left", RIGHT: "right", UP: "up", DOWN: "down"}
 
 
 class CelestialSlide(GridGame):
@@ -9,6 +22,11 @@ class CelestialSlide(GridGame):
         super().__init__(variation, difficulty)
         self.add_observer(CelestialSlideObs())
 
+    def handle_input(self, delta, input_state):
+        super().handle_input(delta, input_state)
+        if input_state.key_pressed(pygame.K_h):
+            self.send_notification(EVT_HINT)
+
 
 class CelestialSlideObs(GridGameObserver):
     def __init__(self):
@@ -23,21 +41,44 @@ class CelestialSlideObs(GridGameObserver):
             "Uranus",
             "Neptune",
         ]
-        self.grid = self.initial_sequence.copy()
-        random.shuffle(self.grid)
-        self.grid.append(None)
+        # Tiles hold planet numbers, counting from 1, with 0 for the empty tile
+        # Solved means planets in order with the empty tile last
+        self.goal = list(range(1, len(self.initial_sequence) + 1)) + [0]
+        order = self.goal[:-1]
+        random.shuffle(order)
+        self.grid = Grid(*self.dimensions)
+        # Half of all shuffles cannot be solved, so those get two planets swapped back
+        self.grid.assign(make_solvable(order + [0], self.dimensions[0]))
+        # The solver keeps state between calls, so only one thread may use it at a time
+        # The thread is forgotten once its answer is taken from `solutions`
+        self.solver = SlideSolver(*self.dimensions)
+        self.solver_thread = None
+        self.solutions = queue.Queue()
+        # Set when the player asks for a hint while the solver is busy, so it gets one once the solver is done
+        self.hint_pending = False
+        self.minimum_moves = None
+        self.moves = 0
+        # The last solution found, and the tiles it starts from, so hints can follow it while the player does
+        self.solution = []
+        self.solution_cells = None
+
+    def fetch_planet(self, index):
+        planet = self.grid[index]
+        return self.initial_sequence[planet - 1] if planet else None
 
     def handle_start(self, game, *args, **kwargs):
         super().handle_start(game, *args, **kwargs)
         game.context.sounds.set_position((self.dimensions[0] // 2, 0.5, 0))
         game.context.spm.output("Welcome!")
+        self.start_solving(SOLVE_START)
 
     def handle_grid_scroll(self, game, direction, *args, **kwargs):
         if not super().handle_grid_scroll(game, direction, *args, **kwargs):
             return False
         index = self.flatten(self.position)
-        if self.grid[index]:
-            game.context.spm.output(self.grid[index])
+        planet = self.fetch_planet(index)
+        if planet:
+            game.context.spm.output(planet)
         else:
             game.context.spm.output("Empty")
         x, z = self.position
@@ -45,24 +86,86 @@ class CelestialSlideObs(GridGameObserver):
         return True
 
     def handle_slide(self, game, direction, *args, **kwargs):
-        new_position = list(
-            map(lambda x, y: x + y, self.position, self.directions[direction])
-        )
+        new_position = self.move(self.position, direction)
+        if not self.in_bounds(new_position):
+            return False
         position, destination = self.flatten(self.position), self.flatten(new_position)
-        if self.in_bounds(new_position) and self.grid[destination] == None:
-            self.grid[position], self.grid[destination] = (
-                self.grid[destination],
-                self.grid[position],
-            )
+        if self.grid[destination] == 0:
+            self.grid.swap(position, destination)
             self.position = new_position
+            self.moves += 1
             x, z = self.position
             game.play_from_dir("slide", position=(x, 0, z))
             return True
         return False
 
     def handle_grid_submit(self, game, *args, **kwargs):
-        if self.grid[:-1] == self.initial_sequence:
+        if self.grid.cells.tolist() == self.goal:
             self.set_win_state()
         else:
             game.context.spm.output("Incomplete")
         return True
+
+    def start_solving(self, purpose, deadline=None):
+        self.solver_thread = threading.Thread(
+            target=self.find_solution,
+            args=(purpose, self.grid.cells.tolist(), deadline),
+            name="CelestialSlideSolver",
+            daemon=True,
+        )
+        self.solver_thread.start()
+
+    def find_solution(self, purpose, cells, deadline):
+        """Runs on the solver thread, so it only touches what it was handed and the solver"""
+        self.solutions.put((purpose, cells, self.solver.solve(cells, deadline)))
+
+    def handle_frame_update(self, game, delta, **kwargs):
+        try:
+            purpose, cells, solution = self.solutions.get_nowait()
+        except queue.Empty:
+            return
+        self.solver_thread = None
+        if solution is not None:
+            if purpose == SOLVE_START:
+                self.minimum_moves = len(solution)
+            # The player may have moved while the solver was busy, in which case the solution no longer applies
+            if cells == self.grid.cells.tolist():
+                self.solution, self.solution_cells = solution, cells
+        if not self.hint_pending and purpose != SOLVE_HINT:
+            return
+        self.hint_pending = False
+        if solution is None and purpose == SOLVE_HINT:
+            game.context.spm.output("No hint found in time")
+        else:
+            self.handle_hint(game)
+
+    def handle_hint(self, game, *args, **kwargs):
+        if self.grid.cells.tolist() == self.solution_cells:
+            self.output_hint(game)
+        elif self.solver_thread is not None:
+            self.hint_pending = True
+        else:
+            self.start_solving(SOLVE_HINT, time.perf_counter() + HINT_TIME_BUDGET)
+        return True
+
+    def output_hint(self, game):
+        solution = self.solution
+        if not solution:
+            game.context.spm.output("Solved, press enter")
+            return
+        index, empty = solution[0], self.grid.cells.index(0)
+        width = self.dimensions[0]
+        offset = (empty % width - index % width, empty // width - index // width)
+        direction = DIRECTION_NAMES[self.directions.index(offset)]
+        game.context.spm.output("Slide %s %s" % (self.fetch_planet(index), direction))
+        # Once the player makes the move, the rest of the solution still holds
+        self.solution_cells = self.solution_cells.copy()
+        self.solution_cells[empty], self.solution_cells[index] = self.grid[index], 0
+        self.solution = solution[1:]
+
+    def gather_statistics(self):
+        base_stats = super().gather_statistics()
+        base_stats["Moves"] = self.moves
+        if self.minimum_moves is not None:
+            base_stats["Minimum moves"] = self.minimum_moves
+        return base_stats
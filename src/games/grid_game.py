@@ -1,3 +1,7 @@
+import random
+from array import array
+from functools import lru_cache
+
 import pygame
 from .observable_game import ObservableGame, GameObserver
 
@@ -5,6 +9,165 @@ EVT_GRID_SUBMIT = "grid_submit"
 EVT_SCROLL = "grid_scroll"
 EVT_SLIDE = "slide"
 LEFT, RIGHT, UP, DOWN = 0, 1, 2, 3
+# (x, y) offsets, indexed by the direction constants above
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+# Every tile touching a given tile, diagonals included
+SURROUNDING = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
+
+
+@lru_cache(maxsize=32)
+def fetch_neighbour_table(width, height, offsets):
+    """Returns, for every flat index of a grid with the given dimensions, a tuple of the flat indices of its in-bounds neighbours.
+    Tables are shared between grids of equal dimensions, so the bounds math is done once per size rather than per query
+    """
+    table = []
+    for y in range(height):
+        for x in range(width):
+            table.append(
+                tuple(
+                    (y + dy) * width + x + dx
+                    for dx, dy in offsets
+                    if 0 <= x + dx < width and 0 <= y + dy < height
+                )
+            )
+    return tuple(table)
+
+
+class Grid:
+    """A fixed-size grid of small integers, stored flat in row-major order.
+    Games map whatever they display onto integers, E.G, letters onto their codes, and keep the lookup on their side
+    """
+
+    def __init__(self, width, height, fill=0, typecode="B"):
+        self.width = width
+        self.height = height
+        self.typecode = typecode
+        self.cells = array(typecode, [fill]) * (width * height)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, index, value):
+        self.cells[index] = value
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def flatten(self, position):
+        """returns a 1d index given a 2d position"""
+        return position[1] * self.width + position[0]
+
+    def unflatten(self, index):
+        return index % self.width, index // self.width
+
+    def in_bounds(self, position):
+        return 0 <= position[0] < self.width and 0 <= position[1] < self.height
+
+    def fetch_neighbours(self, index, offsets=DIRECTIONS):
+        return fetch_neighbour_table(self.width, self.height, offsets)[index]
+
+    def assign(self, values):
+        """Replaces every cell with the given values, in row-major order"""
+        values = array(self.typecode, values)
+        if len(values) != len(self.cells):
+            raise ValueError(
+                "Expected %d values, got %d instead" % (len(self.cells), len(values))
+            )
+        self.cells = values
+
+    def fill(self, value, start=0, stop=None):
+        if stop is None:
+            stop = len(self.cells)
+        self.cells[start:stop] = array(self.typecode, [value]) * (stop - start)
+
+    def shuffle(self):
+        random.shuffle(self.cells)
+
+    def count(self, value):
+        return self.cells.count(value)
+
+    def swap(self, first, second):
+        self.cells[first], self.cells[second] = self.cells[second], self.cells[first]
+
+    def fetch_row(self, y):
+        return self.cells[y * self.width : (y + 1) * self.width]
+
+    def fetch_column(self, x):
+        return self.cells[x :: self.width]
+
+    def set_column(self, x, values, start=0):
+        """Overwrites the column from row `start` downwards with the given values"""
+        self.cells[start * self.width + x :: self.width] = array(self.typecode, values)
+
+    def check_bytes(self):
+        """Whole-grid operations work on the raw bytes, which only map one to one onto tiles for the "B" typecode"""
+        if self.typecode != "B":
+            raise ValueError(
+                'The grid typecode, "%s", is not supported. Only "B" is' % self.typecode
+            )
+
+    def fetch_neighbour_counts(self, value):
+        """Returns a grid holding, for every tile, how many of its surrounding tiles hold `value`.
+        Each row is packed into an integer with a byte per tile, so the 3x3 window sums up with a few shifts and additions per row rather than eight lookups per tile
+        """
+        self.check_bytes()
+        width = self.width
+        mask = (1 << 8 * width) - 1
+        # 1 wherever the value sits, 0 elsewhere
+        cells = self.cells.tobytes().translate(
+            bytes(int(i == value) for i in range(256))
+        )
+        rows = [
+            int.from_bytes(cells[y * width : (y + 1) * width], "little")
+            for y in range(self.height)
+        ]
+        # Every tile plus its left and right neighbours. Counts never exceed 9, so bytes never carry into each other
+        sums = [(r + (r << 8) + (r >> 8)) & mask for r in rows]
+        counts = bytearray()
+        for y, row in enumerate(rows):
+            # The tile itself is no neighbour of its own
+            total = sums[y] - row
+            if y > 0:
+                total += sums[y - 1]
+            if y < self.height - 1:
+                total += sums[y + 1]
+            counts += total.to_bytes(width, "little")
+        grid = Grid(width, self.height)
+        grid.cells = array("B", counts)
+        return grid
+
+    def fetch_bitboard(self, value):
+        """Returns an integer with bit `i` set wherever tile `i` holds `value`"""
+        self.check_bytes()
+        if not self.cells:
+            return 0
+        table = bytes(ord("1") if i == value else ord("0") for i in range(256))
+        # int() wants the most significant bit first, which is the last tile
+        return int(self.cells.tobytes().translate(table)[::-1], 2)
+
+    def fetch_padded(self, border):
+        """Returns the tiles as a bytearray framed by a one tile border of `border`, for walks that would rather not check bounds.
+        Rows are `width + 2` long, so (x, y) sits at `(y + 1) * (width + 2) + x + 1`
+        """
+        self.check_bytes()
+        cells = self.cells.tobytes()
+        edge = bytes((border,))
+        padded = bytearray(edge * (self.width + 2))
+        for y in range(self.height):
+            padded += edge + cells[y * self.width : (y + 1) * self.width] + edge
+        padded += edge * (self.width + 2)
+        return padded
+
+    @classmethod
+    def from_bitboard(cls, width, height, bitboard, value=1):
+        """The reverse of `fetch_bitboard`. Tiles whose bit is set hold `value`, the others 0"""
+        bits = format(bitboard, "0%db" % (width * height))[::-1].encode("ascii")
+        grid = cls(width, height)
+        grid.assign(bits.translate(bytes.maketrans(b"01", bytes((0, value)))))
+        return grid
 
 
 class GridGame(ObservableGame):
@@ -36,29 +199,32 @@ class GridGame(ObservableGame):
 
 
 class GridGameObserver(GameObserver):
+    """Observers are expected to store their tiles in `self.grid`, preferably a `Grid` of `self.dimensions`"""
+
     def __init__(self, length=10, width=10):
         super().__init__()
+        # (columns, rows), matching the (x, y) order of positions
         self.dimensions = (length, width)
         self.position = (0, 0)
-        self.directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+        self.directions = DIRECTIONS
+        self.grid = None
+
+    def move(self, position, direction):
+        """Returns the position one step away in the given direction, in bounds or not"""
+        dx, dy = self.directions[direction]
+        return position[0] + dx, position[1] + dy
 
     def handle_grid_scroll(self, game, direction, *args, **kwargs):
-        new_position = list(
-            map(lambda x, y: x + y, self.position, self.directions[direction])
-        )
+        new_position = self.move(self.position, direction)
         if self.in_bounds(new_position):
             self.position = new_position
             return True
         return False
 
     def in_bounds(self, position):
-        # Under consideration--breaks when grid grows
-        # return not any(map(lambda x, y: x < 0 or x >= y, position, self.dimensions))
-        # Uggly quickpatch
         return (
             0 <= position[0] < self.dimensions[0]
-            and 0 <= position[0] < self.dimensions[1]
-            and 0 <= self.flatten(position) < len(self.grid)
+            and 0 <= position[1] < self.dimensions[1]
         )
 
     def handle_slide(self, game, direction, *args, **kwargs):
@@ -66,4 +232,4 @@ class GridGameObserver(GameObserver):
 
     def flatten(self, position):
         """returns a 1d index given a 2d position"""
-        return self.dimensions[-1] * position[-1] + position[0]
+        return self.dimensions[0] * position[1] + position[0]
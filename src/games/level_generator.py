@@ -0,0 +1,134 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+
+def timed_call(func, args):
+    """Runs within the worker processes, timing the generation itself rather than the trip through the pool"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class LevelGenerator:
+    """Keeps levels ready for the keys a game asks for, generating them on a process pool.
+    `func` is called with the key unpacked as its arguments, and should return `None` when it fails to come up with a level.
+    Otherwise it returns the level along with whether it is what was asked for, `False` marking a best effort that still beats having none.
+    Best efforts are counted apart from proper levels, both when generated and when taken, so the stats tell how often the game got what it asked for.
+    It must be importable by the workers, I.e, defined at the top level of a module.
+    Every key gets a queue of at most `depth` levels, and taking from it lets go of the key
+    """
+
+    def __init__(self, func, depth=2, processes=None):
+        self.func = func
+        self.depth = depth
+        # We leave a core for the game itself
+        self.processes = processes or max(1, min(2, (os.cpu_count() or 2) - 1))
+        self.pool = None
+        self.queues = {}
+        # Levels requested but not yet delivered, per key
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.start_time = 0
+        self.hits = 0
+        self.fallback_hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.generation_time = 0
+
+    def start(self):
+        # Forking a process that has audio and windowing going is asking for trouble, hence spawn everywhere
+        self.pool = multiprocessing.get_context("spawn").Pool(self.processes)
+        self.start_time = time.perf_counter()
+
+    def close(self):
+        if self.pool is None:
+            return
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = None
+        logger.info("Level generation stats: %s" % self.fetch_stats())
+
+    def request(self, key):
+        with self.lock:
+            levels = self.queues.setdefault(key, deque())
+            missing = self.depth - len(levels) - self.pending.get(key, 0)
+            if missing <= 0:
+                return
+            self.pending[key] = self.pending.get(key, 0) + missing
+        for _ in range(missing):
+            self.pool.apply_async(
+                timed_call,
+                (self.func, key),
+                callback=partial(self.store, key),
+                error_callback=partial(self.report_error, key),
+            )
+
+    def settle(self, key):
+        """Expects the lock to be held"""
+        # Keys that were popped no longer track what is in flight
+        if key in self.pending:
+            self.pending[key] -= 1
+
+    def store(self, key, outcome):
+        """Runs on the pool's result thread"""
+        result, elapsed = outcome
+        with self.lock:
+            self.settle(key)
+            self.generation_time += elapsed
+            if result is None:
+                self.failures += 1
+                return
+            if result[1]:
+                self.generated += 1
+            else:
+                self.fallbacks += 1
+            # The game may have moved past the key in the meantime
+            if key in self.queues:
+                self.queues[key].append(result)
+
+    def report_error(self, key, error):
+        with self.lock:
+            self.settle(key)
+            self.failures += 1
+        logger.error("Failed to generate a level for %s: %s" % (key, error))
+
+    def pop(self, key):
+        """Returns a level for the key, or `None` if none is ready, in which case the caller is expected to make one itself"""
+        with self.lock:
+            levels = self.queues.pop(key, None)
+            self.pending.pop(key, None)
+            if levels:
+                level, exact = levels.popleft()
+                if exact:
+                    self.hits += 1
+                else:
+                    self.fallback_hits += 1
+                return level
+            self.misses += 1
+            return None
+
+    def fetch_stats(self):
+        elapsed = time.perf_counter() - self.start_time
+        attempts = self.generated + self.fallbacks + self.failures
+        return {
+            "hits": self.hits,
+            "fallback_hits": self.fallback_hits,
+            "misses": self.misses,
+            # Only levels that were what the game asked for count
+            "hit_ratio": self.hits
+            / max(self.hits + self.fallback_hits + self.misses, 1),
+            "generated": self.generated,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "levels_per_second": self.generated / max(elapsed, 1e-9),
+            "average_generation_time": self.generation_time / max(attempts, 1),
+        }
@@ -1,7 +1,7 @@
 import random
 import pygame
 
-from .grid_game import GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
+from .grid_game import Grid, GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
 
 
 EVT_TIME_CHECK = "time_check"
@@ -31,12 +31,12 @@ class MemoryObs(GridGameObserver):
 
     def handle_start(self, game, *args, **kwargs):
         super().handle_start(game, *args, **kwargs)
-        words = game.context.word_db.fetch_random_words(3, 6, 8, False) * 2
-        self.grid = words.copy()
-        random.shuffle(self.grid)
-        self.revealed = [
-            False,
-        ] * len(self.grid)
+        # Tiles hold the index of their word, so a match is an integer comparison
+        self.words = game.context.word_db.fetch_random_words(3, 6, 8, False)
+        self.grid = Grid(*self.dimensions)
+        self.grid.assign(list(range(len(self.words))) * 2)
+        self.grid.shuffle()
+        self.revealed = Grid(*self.dimensions)
         game.context.spm.output("Welcome!")
 
     def handle_grid_scroll(self, game, direction, *args, **kwargs):
@@ -44,7 +44,7 @@ class MemoryObs(GridGameObserver):
             return False
         index = self.flatten(self.position)
         if self.revealed[index]:
-            game.context.spm.output(self.grid[index])
+            game.context.spm.output(self.words[self.grid[index]])
         else:
             game.context.spm.output(str(self.position))
         return True
@@ -55,19 +55,19 @@ class MemoryObs(GridGameObserver):
             return
         if self.revealed_word == None:
             self.revealed_word = index
-            self.revealed[index] = True
-            game.context.spm.output(f"Revealed {self.grid[index]}")
+            self.revealed[index] = 1
+            game.context.spm.output(f"Revealed {self.words[self.grid[index]]}")
             game.play_from_dir("reveal1")
         else:
-            game.context.spm.output(f"Revealed {self.grid[index]}")
+            game.context.spm.output(f"Revealed {self.words[self.grid[index]]}")
             game.play_from_dir("reveal2")
-            self.revealed[index] = True
+            self.revealed[index] = 1
             if not self.grid[self.revealed_word] == self.grid[index]:
                 game.context.spm.output("No match", False)
-                self.revealed[self.revealed_word] = False
-                self.revealed[index] = False
+                self.revealed[self.revealed_word] = 0
+                self.revealed[index] = 0
                 game.play_wait_from_dir("incorrect")
-            elif all([tile == True for tile in self.revealed]):
+            elif self.revealed.count(0) == 0:
                 self.set_win_state()
             self.revealed_word = None
 
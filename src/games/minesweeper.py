@@ -1,14 +1,107 @@
-from enum import Enum
+from collections import deque
+from enum import IntEnum
+import logging
 import math
+import queue
 import random
+import threading
+import time
 import pygame
-from .grid_game import GridGame, GridGameObserver, LEFT, RIGHT, UP, DOWN
+from .grid_game import (
+    Grid,
+    GridGame,
+    GridGameObserver,
+    LEFT,
+    RIGHT,
+    UP,
+    DOWN,
+    SURROUNDING,
+    fetch_neighbour_table,
+)
+from .level_generator import LevelGenerator
+from .minesweeper_solver import MinesweeperSolver, fetch_set_bits
+
+logger = logging.getLogger(__name__)
 
 EVT_MINE_CHECK = "check_mines"
 EVT_GRID_REVEAL = "reveal_pos"
 EVT_TILE_CNT = "check_empty_tile_count"
 EVT_LVL_SKIP = "skip_level"
 EVT_TILE_MARK = "mark_tile"
+EVT_CASCADE_TOGGLE = "toggle_cascade"
+EVT_HINT = "hint"
+# How long the solver may think before settling on what it found so far
+HINT_TIME_BUDGET = 0.5
+# How many levels ahead we have boards generated
+LEVEL_LOOKAHEAD = 3
+# Layouts a worker tries before giving up on a level that needs no guessing
+MAX_LAYOUT_ATTEMPTS = 10
+# The share of safe tiles we are willing to reveal on top of the usual ones to spare the player a guess
+MAX_FREE_REVEALS = 0.1
+# How long the solver may think each time it plays a layout out
+LAYOUT_SOLVE_BUDGET = 0.05
+
+
+def fetch_layout(dimensions, mine_density, reveal_density):
+    """Returns the mine and seen bitboards of a random level"""
+    dims = dimensions[0] * dimensions[1]
+    # We floor because rounding up any decimals will cause us to be over the desired ratio
+    total_mines = math.floor(dims * mine_density)
+    reveal_k = math.floor(dims * reveal_density)
+    # Mines come first, then the tiles we reveal, and shuffling scatters both
+    layout = Grid(*dimensions, TileEnum.empty)
+    layout.fill(TileEnum.mined, 0, total_mines)
+    layout.fill(TileEnum.seen, total_mines, total_mines + reveal_k)
+    layout.shuffle()
+    return layout.fetch_bitboard(TileEnum.mined), layout.fetch_bitboard(TileEnum.seen)
+
+
+def generate_solvable_layout(dimensions, mine_density, reveal_density):
+    """Meant for `LevelGenerator` workers. Returns the mine and seen bitboards of a level, and whether the solver finishes it without guessing.
+    Where the solver gets stuck, the player is handed the tile they would have had to guess as one more revealed tile, for as long as `MAX_FREE_REVEALS` allows.
+    Dense levels can need more than that on every attempt, in which case we settle for the attempt needing the fewest, with as many of them revealed as allowed.
+    Such a level still calls for guessing, so it comes flagged as not guess-free
+    """
+    width, height = dimensions
+    neighbours = fetch_neighbour_table(width, height, SURROUNDING)
+    # (mines, seen, free reveals, safe tiles) of the attempt needing the fewest free reveals so far
+    best = None
+    for _ in range(MAX_LAYOUT_ATTEMPTS):
+        mines, seen = fetch_layout(dimensions, mine_density, reveal_density)
+        counts = Grid.from_bitboard(width, height, mines).fetch_neighbour_counts(1)
+        solver = MinesweeperSolver(width, height, counts)
+        safe_total = width * height - mines.bit_count()
+        revealed, found = set(fetch_set_bits(seen)), set()
+        free_reveals = []
+        while True:
+            revealed, found = solver.play_out(
+                revealed, found, time.perf_counter() + LAYOUT_SOLVE_BUDGET
+            )
+            if len(revealed) >= safe_total:
+                break
+            # No use carrying on once this attempt needs more help than the best one
+            if best is not None and len(free_reveals) >= len(best[2]):
+                free_reveals = None
+                break
+            # We prefer tiles next to what is known, as those are the ones a player would be guessing at
+            hidden = [
+                t
+                for t in range(width * height)
+                if t not in revealed and not mines >> t & 1
+            ]
+            frontier = [t for t in hidden if any(n in revealed for n in neighbours[t])]
+            tile = random.choice(frontier or hidden)
+            free_reveals.append(tile)
+            revealed.add(tile)
+        if free_reveals is None:
+            continue
+        if len(free_reveals) <= safe_total * MAX_FREE_REVEALS:
+            return (mines, seen | sum(1 << t for t in free_reveals)), True
+        best = mines, seen, free_reveals, safe_total
+    mines, seen, free_reveals, safe_total = best
+    # The reveals come in the order the solver got stuck, so the player guesses only past the last one we hand out
+    allowed = free_reveals[: math.floor(safe_total * MAX_FREE_REVEALS)]
+    return (mines, seen | sum(1 << t for t in allowed)), False
 
 
 class Minesweeper(GridGame):
@@ -28,6 +121,10 @@ class Minesweeper(GridGame):
             self.send_notification(EVT_LVL_SKIP)
         if input_state.key_pressed(pygame.K_m):
             self.send_notification(EVT_TILE_MARK)
+        if input_state.key_pressed(pygame.K_c):
+            self.send_notification(EVT_CASCADE_TOGGLE)
+        if input_state.key_pressed(pygame.K_h):
+            self.send_notification(EVT_HINT)
 
 
 class MinesweeperObs(GridGameObserver):
@@ -35,122 +132,232 @@ class MinesweeperObs(GridGameObserver):
         super().__init__(7, 7)
         self.mine_density = 0.4
         self.reveal_density = 0.4
-        self.mine_dirs = (
-            (-1, 0),
-            (-1, -1),
-            (0, -1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-            (0, 1),
-            (-1, 1),
-        )
-        self.total_empty_tiles = 0
-        self.marked_tiles = set()
+        # Bitboards, with bit `i` standing for the tile at flat index `i`
+        self.mines = 0
+        self.seen = 0
+        self.marked = 0
+        # Every bit of the board set
+        self.board = 0
+        self.mine_counts = None
+        # When set, revealing a tile with no adjacent mines reveals the whole empty region around it
+        self.cascade = False
+        # Hints are worked out on a worker thread, which hands them back through the queue
+        self.hint_thread = None
+        self.hints = queue.Queue()
+        # Boards that need no guessing, or as little as could be managed, are generated in the background for the levels in `upcoming`
+        # Levels are keyed by (dimensions, mine_density, reveal_density)
+        self.generator = None
+        self.upcoming = []
+
+    @property
+    def total_empty_tiles(self):
+        return self.board.bit_count() - (self.mines | self.seen).bit_count()
 
     def handle_start(self, game, *args, **kwargs):
         super().handle_start(game, *args, **kwargs)
         self.game = game
         self.fill_grid()
+        # Levels never repeat, so a second board per level would only ever be thrown away
+        self.generator = LevelGenerator(generate_solvable_layout, depth=1)
+        self.generator.start()
+        self.plan_levels()
         game.context.spm.output(self.fetch_tile_info(self.flatten(self.position)))
 
-    def fill_grid(self):
-        dims = self.dimensions[0] * self.dimensions[1]
+    def run_cleanup(self, game):
+        if self.generator is not None:
+            self.generator.close()
+            self.generator = None
+
+    def fill_grid(self, layout=None):
+        """Sets up a level of the current dimensions, from the given mine and seen bitboards if any, at random otherwise"""
         self.position = (0, 0)
-        # We floor because rounding up any decimals will cause us to be over the desired ratio
-        total_mines = math.floor(dims * self.mine_density)
-        reveal_k = math.floor(dims * self.reveal_density)
-        self.total_empty_tiles = dims - total_mines - reveal_k
-
-        # Fill up grid
-        self.grid = [
-            TileEnum.mined if i < total_mines else TileEnum.empty for i in range(dims)
-        ]
-        # We reveal a certain percentage of empty tiles by considering the entries to the right of the last mine
-        for k in random.sample(
-            range(
-                next(
-                    i
-                    for i in reversed(range(len(self.grid)))
-                    if self.grid[i] == TileEnum.mined
-                ),
-                dims,
-            ),
-            reveal_k,
-        ):
-            self.grid[k] = TileEnum.seen
-
-        random.shuffle(self.grid)
+        if layout is None:
+            layout = fetch_layout(
+                self.dimensions, self.mine_density, self.reveal_density
+            )
+        self.load_snapshot((self.dimensions, *layout, 0))
+
+    def fetch_level(self):
+        return self.dimensions, self.mine_density, self.reveal_density
+
+    def fetch_next_level(self, level):
+        dimensions, mine_density, reveal_density = level
+        # We also grow the grid
+        # We do so unevenly to lessen the difficulty curve
+        # It's also possible the grid may not even grow
+        dims_copy = list(dimensions)
+        dims_copy[random.randint(0, len(dimensions) - 1)] += random.randint(0, 2)
+        # We keep this super super basic... for now
+        return tuple(dims_copy), mine_density ** 0.93, reveal_density ** 1.1
+
+    def plan_levels(self):
+        """Decides upon the next few levels in advance, so their boards can be generated before they are needed"""
+        while len(self.upcoming) < LEVEL_LOOKAHEAD:
+            level = self.fetch_next_level(
+                self.upcoming[-1] if self.upcoming else self.fetch_level()
+            )
+            self.upcoming.append(level)
+            if self.generator is not None:
+                self.generator.request(level)
+
+    def fetch_snapshot(self):
+        """Returns everything needed to restore the level as is"""
+        return self.dimensions, self.mines, self.seen, self.marked
+
+    def load_snapshot(self, snapshot):
+        self.dimensions, self.mines, self.seen, self.marked = snapshot
+        self.board = (1 << self.dimensions[0] * self.dimensions[1]) - 1
+        # Mines stay put for the whole level, so every count is worked out once here
+        self.mine_counts = Grid.from_bitboard(
+            *self.dimensions, self.mines
+        ).fetch_neighbour_counts(1)
 
     def fetch_tile_info(self, index):
+        bit = 1 << index
         # A quick check
-        if index in self.marked_tiles:
+        if self.marked & bit:
             return "Marked"
-        t = self.grid[index]
-        if t == TileEnum.seen:
+        if self.seen & bit:
             return "Seen"
-        elif t == TileEnum.empty or t == TileEnum.mined:
-            return "Hidden"
-        else:
-            return "Unknown"
+        return "Hidden"
 
     def handle_grid_scroll(self, game, direction, *args, **kwargs):
         if not super().handle_grid_scroll(game, direction, *args, **kwargs):
             return False
-        print(self.dimensions, self.position)
         game.context.spm.output(self.fetch_tile_info(self.flatten(self.position)))
 
     def fetch_adjacent_empty_tile_count(self):
-        cnt = 0
-        for p in self.mine_dirs:
-            new_pos = self.position[0] + p[0], self.position[1] + p[1]
-            if not self.in_bounds(new_pos):
-                continue
-            index = self.flatten(new_pos)
-            if self.grid[index] == TileEnum.mined:
-                cnt += 1
-
-        return cnt
+        return self.mine_counts[self.flatten(self.position)]
 
     def handle_check_mines(self, game, *args, **kwargs):
-        index = self.flatten(self.position)
-        if self.grid[index] != TileEnum.seen:
+        if not self.seen & 1 << self.flatten(self.position):
             game.context.spm.output("You have not revealed this tile yet")
         else:
             game.context.spm.output(str(self.fetch_adjacent_empty_tile_count()))
 
     def handle_reveal_pos(self, game, *args, **kwargs):
-        index = self.flatten(self.position)
-        t = self.grid[index]
-        if t == TileEnum.seen:
+        bit = 1 << self.flatten(self.position)
+        if self.seen & bit:
             game.context.spm.output("This tile has already been revealed")
-        elif t == TileEnum.mined:
+        elif self.mines & bit:
             self.game.play_wait_from_dir("explode", callback=self.set_lose_state)
-        elif t == TileEnum.empty:
-            self.grid[index] = TileEnum.seen
-            self.total_empty_tiles -= 1
+        else:
+            index = self.flatten(self.position)
+            if self.cascade and not self.mine_counts[index]:
+                revealed = self.fetch_cascade(index)
+            else:
+                revealed = bit
+            # However many tiles were uncovered, the player hears about them once
+            self.seen |= revealed
             self.game.play_from_dir("reveal")
-            if self.total_empty_tiles == 0:
+            if self.mines | self.seen == self.board:
                 self.level_up()
-            game.context.spm.output(str(self.fetch_adjacent_empty_tile_count()))
+            count = str(self.fetch_adjacent_empty_tile_count())
+            if revealed != bit:
+                count += "; %d tiles revealed" % revealed.bit_count()
+            game.context.spm.output(count)
+
+    def fetch_cascade(self, index):
+        """Returns a bitboard of the hidden tiles connected to `index` through tiles with no adjacent mines, border tiles included.
+        The walk goes through revealed tiles too, as levels start partly revealed. Marked tiles are left alone, and so is whatever lies past them
+        """
+        width, height = self.dimensions
+        stride = width + 2
+        # 1 for tiles the walk may not enter, which the border takes care of for the edges
+        tiles = Grid.from_bitboard(
+            width, height, self.mines | self.marked
+        ).fetch_padded(1)
+        counts = self.mine_counts.fetch_padded(1)
+        offsets = tuple(dy * stride + dx for dx, dy in SURROUNDING)
+        start = (index // width + 1) * stride + index % width + 1
+        tiles[start] = 2
+        queue = deque((start,))
+        while queue:
+            i = queue.popleft()
+            for o in offsets:
+                n = i + o
+                if not tiles[n]:
+                    tiles[n] = 2
+                    if not counts[n]:
+                        queue.append(n)
+        revealed = Grid(width, height)
+        revealed.assign(
+            b"".join(
+                tiles[y * stride + 1 : y * stride + 1 + width]
+                for y in range(1, height + 1)
+            )
+        )
+        # Revealed tiles were only passed through
+        return revealed.fetch_bitboard(2) & ~self.seen
+
+    def handle_hint(self, game, *args, **kwargs):
+        if self.hint_thread is not None and self.hint_thread.is_alive():
+            game.context.spm.output("Still looking for a hint")
+            return
+        self.hint_thread = threading.Thread(
+            target=self.find_hint,
+            args=(self.fetch_snapshot(), self.mine_counts),
+            name="MinesweeperHint",
+            daemon=True,
+        )
+        self.hint_thread.start()
+
+    def find_hint(self, snapshot, counts):
+        """Runs on the hint thread, so it only touches what it was handed"""
+        (width, height), mines, seen, marked = snapshot
+        solver = MinesweeperSolver(width, height, counts)
+        safe, found = solver.solve(
+            fetch_set_bits(seen), deadline=time.perf_counter() + HINT_TIME_BUDGET
+        )
+        self.hints.put((snapshot, safe, found))
+
+    def handle_frame_update(self, game, delta, **kwargs):
+        try:
+            snapshot, safe, found = self.hints.get_nowait()
+        except queue.Empty:
+            return
+        # The level changed while the solver was busy
+        if snapshot[:2] != (self.dimensions, self.mines):
+            return
+        # The player may have gotten there on their own in the meantime
+        safe = [t for t in safe if not self.seen >> t & 1]
+        found = [t for t in found if not self.marked >> t & 1]
+        unflatten = self.mine_counts.unflatten
+        # We point at whatever is closest to the player
+        distance = lambda t: max(
+            abs(a - b) for a, b in zip(unflatten(t), self.position)
+        )
+        if safe:
+            label, tile = "Safe", min(safe, key=distance)
+        elif found:
+            label, tile = "Mine", min(found, key=distance)
+        else:
+            game.context.spm.output("No tile is certain yet")
+            return
+        hint_x, hint_y = unflatten(tile)
+        game.context.spm.output(f"{label}: {hint_x+1}, {hint_y+1}")
+
+    def handle_toggle_cascade(self, game, *args, **kwargs):
+        self.cascade = not self.cascade
+        game.context.spm.output("Cascade %s" % ("on" if self.cascade else "off"))
 
     def handle_check_empty_tile_count(self, game, *args, **kwargs):
         game.context.spm.output("%s tiles remaining" % self.total_empty_tiles)
 
     def level_up(self):
-        # We keep this super super basic... for now
-        self.reveal_density **= 1.1
-        self.mine_density **= 0.93
-        # We also grow the grid
-        # We do so unevenly to lessen the difficulty curve
-        # It's also possible the grid may not even grow
-        dims_copy = list(self.dimensions)
-        dims_copy[random.randint(0, len(self.dimensions) - 1)] += random.randint(0, 2)
-        self.dimensions = tuple(dims_copy)
-        self.fill_grid()
-        self.marked_tiles.clear()
+        self.advance_level()
         self.game.play_wait_from_dir("next_level")
 
+    def advance_level(self):
+        if not self.upcoming:
+            self.plan_levels()
+        level = self.upcoming.pop(0)
+        self.dimensions, self.mine_density, self.reveal_density = level
+        # Should the generator not have kept up, the player gets a random board rather than a wait
+        layout = self.generator.pop(level) if self.generator is not None else None
+        self.fill_grid(layout)
+        self.plan_levels()
+
     def handle_skip_level(self, game, *args, **kwargs):
         # This is somewhat of an arbitrary number
         # Perhaps we'll make this percentage-based, too
@@ -164,22 +371,20 @@ class MinesweeperObs(GridGameObserver):
             game.context.spm.output("There are still plenty of tiles to find...")
 
     def handle_mark_tile(self, game, *args, **kwargs):
-        index = self.flatten(self.position)
-        if index in self.marked_tiles:
-            self.marked_tiles.remove(index)
+        bit = 1 << self.flatten(self.position)
+        if self.marked & bit:
+            self.marked ^= bit
             game.context.spm.output("Unmarked")
+        # We should only allow marking hidden tiles
+        elif self.seen & bit:
+            game.context.spm.output("There is no point in marking already-known tiles")
         else:
-            # We should only allow marking hidden tiles
-            if self.grid[index] == TileEnum.seen:
-                game.context.spm.output(
-                    "There is no point in marking already-known tiles"
-                )
-            else:
-                self.marked_tiles.add(index)
-                game.context.spm.output("Marked")
+            self.marked |= bit
+            game.context.spm.output("Marked")
 
 
-class TileEnum(Enum):
+# Used to lay levels out, hence the integers
+class TileEnum(IntEnum):
     empty = 0
     seen = 1
     mined = 2
@@ -0,0 +1,222 @@
+import time
+
+from .grid_game import SURROUNDING, fetch_neighbour_table
+
+# Frontier regions larger than this take far longer to enumerate than any deadline allows, so we leave them be
+MAX_COMPONENT_SIZE = 48
+# Looking at the clock costs time too, so enumeration only does so every so many nodes
+DEADLINE_CHECK_INTERVAL = 512
+
+
+def fetch_set_bits(bitboard):
+    """Returns the indices of the set bits of `bitboard`, lowest first"""
+    bits = format(bitboard, "b")[::-1]
+    indices = []
+    i = bits.find("1")
+    while i != -1:
+        indices.append(i)
+        i = bits.find("1", i + 1)
+    return indices
+
+
+class MinesweeperSolver:
+    """Finds tiles that are certainly safe or certainly mined, judging only by the counts of the tiles seen so far.
+    Every seen tile yields a constraint, I.e, how many of its hidden neighbours are mines. Simple rules settle what they can,
+    and whatever they leave undecided along the frontier is settled by enumerating every consistent layout, for as long as the deadline allows
+    """
+
+    def __init__(self, width, height, counts):
+        self.width = width
+        self.height = height
+        # Adjacent mine counts for every tile, of which only those of seen tiles are ever read
+        self.counts = counts
+        self.neighbours = fetch_neighbour_table(width, height, SURROUNDING)
+        self.known = {}
+        self.found = {}
+        # constraint id -> [hidden tiles, mines among them]
+        self.constraints = {}
+        # hidden tile -> ids of the constraints it appears in
+        self.watchers = {}
+        self.pending = set()
+
+    def solve(self, seen, mines=(), deadline=None):
+        """Expects the seen tiles and the tiles known to be mines as iterables of flat indices.
+        Returns the sets of safe tiles and mined tiles that follow from them, those given excluded
+        """
+        self.known = dict.fromkeys(seen, 0)
+        self.known.update(dict.fromkeys(mines, 1))
+        self.found = {}
+        self.constraints = {}
+        self.watchers = {}
+        for tile, value in self.known.items():
+            if value:
+                continue
+            hidden = set()
+            left = self.counts[tile]
+            for n in self.neighbours[tile]:
+                k = self.known.get(n)
+                if k is None:
+                    hidden.add(n)
+                else:
+                    left -= k
+            if hidden:
+                self.constraints[tile] = [hidden, left]
+                for n in hidden:
+                    self.watchers.setdefault(n, set()).add(tile)
+        self.pending = set(self.constraints)
+        while True:
+            self.propagate()
+            if not self.enumerate(deadline):
+                break
+        safe = {t for t, v in self.found.items() if not v}
+        return safe, set(self.found) - safe
+
+    def play_out(self, seen, mines=(), deadline=None):
+        """Keeps revealing whatever is certainly safe until nothing certain remains.
+        Returns the sets of seen and mined tiles known at that point
+        """
+        seen = set(seen)
+        mines = set(mines)
+        while True:
+            safe, found = self.solve(seen, mines, deadline)
+            mines |= found
+            if not safe:
+                return seen, mines
+            seen |= safe
+
+    def solve_fully(self, seen, safe_total, deadline=None):
+        """Returns whether playing out from `seen` reveals all `safe_total` safe tiles, I.e, whether the board can be finished without guessing"""
+        return len(self.play_out(seen, deadline=deadline)[0]) >= safe_total
+
+    def mark(self, tile, value):
+        if tile in self.known:
+            return
+        self.known[tile] = value
+        self.found[tile] = value
+        for cid in self.watchers.pop(tile, ()):
+            constraint = self.constraints.get(cid)
+            if constraint is not None:
+                constraint[0].discard(tile)
+                constraint[1] -= value
+                self.pending.add(cid)
+
+    def drop(self, cid):
+        for t in self.constraints.pop(cid)[0]:
+            self.watchers[t].discard(cid)
+
+    def propagate(self):
+        """Applies the trivial and subset rules until neither finds anything new"""
+        while self.pending:
+            cid = self.pending.pop()
+            constraint = self.constraints.get(cid)
+            if constraint is None:
+                continue
+            tiles, left = constraint
+            if not tiles:
+                self.drop(cid)
+                continue
+            # Either none or all of the hidden tiles are mines
+            if left == 0 or left == len(tiles):
+                self.drop(cid)
+                for t in tiles:
+                    self.mark(t, int(left > 0))
+                continue
+            # If one constraint covers another, the tiles only the larger one covers hold the difference
+            for other_id in set().union(*(self.watchers[t] for t in tiles)):
+                other = self.constraints.get(other_id)
+                if other_id == cid or other is None:
+                    continue
+                if tiles < other[0]:
+                    rest, rest_left = other[0] - tiles, other[1] - left
+                elif other[0] < tiles:
+                    rest, rest_left = tiles - other[0], left - other[1]
+                else:
+                    continue
+                if rest_left == 0 or rest_left == len(rest):
+                    for t in rest:
+                        self.mark(t, int(rest_left > 0))
+                    # The constraints changed under us, so we come back to this one later
+                    self.pending.add(cid)
+                    break
+
+    def fetch_components(self):
+        """Splits the frontier into groups of hidden tiles that share no constraint with one another"""
+        components = []
+        visited = set()
+        for start in self.watchers:
+            if start in visited or not self.watchers[start]:
+                continue
+            visited.add(start)
+            component = [start]
+            for tile in component:
+                for cid in self.watchers[tile]:
+                    for t in self.constraints[cid][0]:
+                        if t not in visited:
+                            visited.add(t)
+                            component.append(t)
+            components.append(component)
+        return components
+
+    def enumerate(self, deadline):
+        """Marks the frontier tiles that hold the same value across every consistent layout. Returns whether any were found"""
+        found = False
+        for component in sorted(self.fetch_components(), key=len):
+            if len(component) > MAX_COMPONENT_SIZE:
+                break
+            certain = self.fetch_certain_tiles(component, deadline)
+            if certain is None:
+                break
+            for t, value in certain.items():
+                self.mark(t, value)
+                found = True
+        return found
+
+    def fetch_certain_tiles(self, tiles, deadline):
+        """Returns {tile: value} for the tiles of the component that agree across all of its consistent layouts, or `None` if the deadline passed first"""
+        watching = [tuple(self.watchers[t]) for t in tiles]
+        cids = set().union(*watching)
+        # Mines each constraint still needs, and hidden tiles it still has to place them on
+        need = {cid: self.constraints[cid][1] for cid in cids}
+        free = {cid: len(self.constraints[cid][0]) for cid in cids}
+        tally = [0] * len(tiles)
+        assignment = []
+        solutions = 0
+        nodes = 0
+
+        def search(i):
+            nonlocal solutions, nodes
+            nodes += 1
+            if (
+                deadline is not None
+                and nodes % DEADLINE_CHECK_INTERVAL == 0
+                and time.perf_counter() > deadline
+            ):
+                return False
+            if i == len(tiles):
+                solutions += 1
+                for j, value in enumerate(assignment):
+                    tally[j] += value
+                return True
+            for value in (0, 1):
+                for cid in watching[i]:
+                    free[cid] -= 1
+                    need[cid] -= value
+                if all(0 <= need[cid] <= free[cid] for cid in watching[i]):
+                    assignment.append(value)
+                    if not search(i + 1):
+                        return False
+                    assignment.pop()
+                for cid in watching[i]:
+                    free[cid] += 1
+                    need[cid] += value
+            return True
+
+        if not search(0):
+            return None
+        if not solutions:
+            return {}
+        return {
+            t: int(count > 0)
+            for t, count in zip(tiles, tally)
+            if count == 0 or count == solutions
+        }
@@ -1,19 +1,40 @@
+import logging
+import time
+
 import pygame
 from game_menus import QuitMenu, StatisticsMenu
 from observer import Observer
 from .base_game import Game
 from .game_utils import GenericGameStateEnum
 
+logger = logging.getLogger(__name__)
+
 EVT_GAME_STARTED = "start"
 EVT_GAME_ENDED = "end"
 EVT_REQUEST_QUIT = "menu_quit"
 EVT_GAME_UPDATE = "frame_update"
+# Events that are never queued, as their handlers rely on the screen stack being as it was when they were sent
+IMMEDIATE_EVENTS = frozenset((EVT_GAME_STARTED, EVT_GAME_ENDED))
 
 
 class ObservableGame(Game):
+    # Games can opt into queueing notifications, which are then handed out once per frame, in the order they were sent
+    # The queue drains before input is handled, so queued input takes effect a frame later
+    defer_events = False
+    # Event types for which identical notifications within one frame collapse into the first, E.G, scrolls from key repeat
+    # Distinct key presses collapse just the same, so this only suits events where a frame's worth of repeats means nothing more than one
+    coalesced_events = frozenset()
+
     def __init__(self, variation, difficulty):
         super().__init__(variation, difficulty)
         self.observers = []
+        # (event type, args, kwargs), in the order they were sent
+        self.event_queue = []
+        # Keys of the coalesced notifications queued since the last drain
+        self.coalesced = set()
+        self.max_events_per_frame = 0
+        self.max_drain_time = 0
+        self.coalesced_count = 0
 
     def add_observer(self, o):
         self.observers.append(o)
@@ -22,37 +43,86 @@ class ObservableGame(Game):
         self.observers.remove(o)
 
     def send_notification(self, event_type, *args, **kwargs):
+        if not self.defer_events or event_type in IMMEDIATE_EVENTS:
+            self.dispatch(event_type, *args, **kwargs)
+            return
+        if event_type in self.coalesced_events:
+            key = (event_type, args, tuple(sorted(kwargs.items())))
+            if key in self.coalesced:
+                self.coalesced_count += 1
+                return
+            self.coalesced.add(key)
+        self.event_queue.append((event_type, args, kwargs))
+
+    def dispatch(self, event_type, *args, **kwargs):
+        if self.is_exiting:
+            # The game already ended, E.G, on an earlier key press of the same frame
+            return
         for o in self.observers:
-            o.notify(
-                event_type,
-                variation=self.variation,
-                difficulty=self.difficulty,
-                game=self,
-                *args,
-                **kwargs,
-            )
+            self.notify_observer(o, event_type, *args, **kwargs)
 
             if o.has_ended():
                 # We notify the observer one more time and quit
                 # Will probably be changed when sounds are added
-                o.notify(
-                    EVT_GAME_ENDED,
-                    variation=self.variation,
-                    difficulty=self.difficulty,
-                    game=self,
-                    *args,
-                    **kwargs,
-                )
+                self.notify_observer(o, EVT_GAME_ENDED, *args, **kwargs)
                 self.exit()
 
+    def notify_observer(self, o, event_type, *args, **kwargs):
+        o.notify(
+            event_type,
+            variation=self.variation,
+            difficulty=self.difficulty,
+            game=self,
+            *args,
+            **kwargs,
+        )
+
+    def drain_events(self):
+        """Hands out the queued notifications, including any sent while doing so, then checks once whether the game has ended"""
+        if self.is_exiting:
+            # Nobody is listening anymore
+            self.event_queue.clear()
+            self.coalesced.clear()
+            return
+        start = time.perf_counter()
+        count = 0
+        while self.event_queue:
+            queue, self.event_queue = self.event_queue, []
+            self.coalesced.clear()
+            for event_type, args, kwargs in queue:
+                for o in self.observers:
+                    self.notify_observer(o, event_type, *args, **kwargs)
+            count += len(queue)
+        for o in self.observers:
+            if o.has_ended():
+                self.notify_observer(o, EVT_GAME_ENDED)
+                self.exit()
+                break
+        self.max_events_per_frame = max(self.max_events_per_frame, count)
+        self.max_drain_time = max(self.max_drain_time, time.perf_counter() - start)
+
+    def fetch_event_stats(self):
+        return {
+            "max_events_per_frame": self.max_events_per_frame,
+            "max_drain_time": self.max_drain_time,
+            "coalesced": self.coalesced_count,
+        }
+
     def on_create(self):
         """Quick wrapper to send out start event"""
         self.send_notification(EVT_GAME_STARTED)
 
+    def on_destroy(self):
+        if self.defer_events:
+            logger.debug("Event queue stats: %s" % self.fetch_event_stats())
+
     def update(self, delta, is_covered_by_another_screen):
         super().update(delta, is_covered_by_another_screen)
         if not is_covered_by_another_screen:
             self.send_notification(EVT_GAME_UPDATE, delta=delta)
+        # Input queued during the previous frame goes out ahead of this frame's update
+        if self.defer_events:
+            self.drain_events()
 
     def handle_input(self, delta, input_state):
         """Generic game keys"""
@@ -69,34 +139,50 @@ class GameObserver(Observer):
     def __init__(self):
         self.game_state = GenericGameStateEnum.undefined
 
-    def fetch_dynamic_attr(self, attr, variation):
+    # (observer class, variation, event type) -> handler functions, most specific first
+    # Handlers are looked up on the class rather than the instance, so every instance of a class shares the same entry
+    dispatch_table = {}
+
+    @classmethod
+    def fetch_handlers(cls, attr, variation):
+        key = (cls, variation, attr)
+        handlers = GameObserver.dispatch_table.get(key)
+        if handlers is not None:
+            return handlers
         # Make variation a valid match string
-        variation = variation.lower().replace(" ", "_")
+        match_variation = variation.lower().replace(" ", "_")
         func_list = []
         # We support logic functions that look like handle_partial_submit, where submit is event type and partial is the game varient
         # The downside to this is needing to update code when the variation is renamed
         # The alternative was to treat variations as integers
-        if len(variation) > 0:
-            attr_var_name = f"handle_{variation}_{attr}"
-            if hasattr(self, attr_var_name):
-                func_list.append(getattr(self, attr_var_name))
-        attr_name = f"handle_{attr}"
-        if hasattr(self, attr_name):
-            func_list.append(getattr(self, attr_name))
+        if len(match_variation) > 0:
+            func = getattr(cls, f"handle_{match_variation}_{attr}", None)
+            if func is not None:
+                func_list.append(func)
+        func = getattr(cls, f"handle_{attr}", None)
+        if func is not None:
+            func_list.append(func)
 
         if len(func_list) == 0:
-            return [self.handle_event]
-        else:
-            return func_list
+            func_list.append(cls.handle_event)
+        handlers = GameObserver.dispatch_table[key] = tuple(func_list)
+        return handlers
+
+    def fetch_dynamic_attr(self, attr, variation):
+        return [f.__get__(self) for f in self.fetch_handlers(attr, variation)]
 
     def notify(self, event_type, *args, **kwargs):
         if "game" in kwargs:
             context = kwargs.pop("game")
         else:
             context = None
-        func_list = self.fetch_dynamic_attr(event_type, kwargs.get("variation", ""))
-        for f in func_list:
-            if not f(context, *args, **kwargs):
+        variation = kwargs.get("variation", "")
+        # After the first event of a kind, dispatch is a single dict lookup
+        handlers = GameObserver.dispatch_table.get((type(self), variation, event_type))
+        if handlers is None:
+            handlers = self.fetch_handlers(event_type, variation)
+        for f in handlers:
+            if not f(self, context, *args, **kwargs):
                 break
 
     def handle_start(self, game, *args, **kwargs):
@@ -34,10 +34,16 @@ class QuickTypeObs(TextGameObserver):
     def handle_start(self, game, *args, **kwargs):
         super().handle_start(game, *args, **kwargs)
         self.game = game
+        # Words are fetched mid-play, so we have them prepared in the background
+        game.context.word_db.prefetch_words(*self.fetch_word_bounds())
         return True
 
+    def run_cleanup(self, game):
+        game.context.word_db.release_prefetched_words(*self.fetch_word_bounds())
+
     def handle_text_unicode(self, game, char, difficulty, *args, **kwargs):
-        if not self.is_char_matching(char):
+        # Keys typed in the same frame as the one that finished the word go nowhere, as the next word arrives with the next frame
+        if self.word is None or not self.is_char_matching(char):
             return False
         self.guess += char
         game.context.spm.output(char)
@@ -68,9 +74,12 @@ class QuickTypeObs(TextGameObserver):
         game.context.spm.output(f"{time} seconds remaining")
         return True
 
+    def fetch_word_bounds(self):
+        return 3, self.game.difficulty + 5
+
     def fetch_word(self):
         self.guess = ""
-        self.word = self.game.context.word_db.fetch_random_word(
-            3, self.game.difficulty + 5
+        self.word = self.game.context.word_db.fetch_prefetched_word(
+            *self.fetch_word_bounds()
         )
         self.game.context.spm.output(self.word)
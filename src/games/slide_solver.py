@@ -0,0 +1,265 @@
+import time
+from collections import deque
+
+from .grid_game import DIRECTIONS, fetch_neighbour_table
+
+# Looking at the clock costs time too, so the search only does so every so many nodes
+DEADLINE_CHECK_INTERVAL = 1024
+
+# Boards are flat sequences of tile numbers, counting from 1, with 0 for the blank
+# Solved means tiles in order with the blank last
+
+
+def fetch_goal(width, height):
+    return list(range(1, width * height)) + [0]
+
+
+def is_solvable(cells, width):
+    """Only half of all orderings can be slid into the goal. Which half a board belongs to depends on the parity of its inversions"""
+    tiles = [c for c in cells if c]
+    inversions = sum(
+        1
+        for i in range(len(tiles))
+        for j in range(i + 1, len(tiles))
+        if tiles[i] > tiles[j]
+    )
+    if width % 2:
+        return inversions % 2 == 0
+    # With an even width, moving the blank up or down flips the parity, so its row counts too
+    blank_row_from_bottom = len(cells) // width - list(cells).index(0) // width
+    return (inversions + blank_row_from_bottom) % 2 == 1
+
+
+def make_solvable(cells, width):
+    """Returns the board as is if it can be solved, otherwise with its first two tiles swapped, which flips the parity"""
+    cells = list(cells)
+    if not is_solvable(cells, width):
+        first, second = [i for i, c in enumerate(cells) if c][:2]
+        cells[first], cells[second] = cells[second], cells[first]
+    return cells
+
+
+def fetch_line_conflict(goal_lines):
+    """Expects the goal positions, along the line, of the tiles that belong on it, in the order they appear.
+    Every tile that has to leave the line for the others to pass costs two extra moves. The fewest such tiles are those outside the longest increasing run
+    """
+    if len(goal_lines) < 2:
+        return 0
+    longest = [1] * len(goal_lines)
+    for i in range(len(goal_lines)):
+        for j in range(i):
+            if goal_lines[j] < goal_lines[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return 2 * (len(goal_lines) - max(longest))
+
+
+class PatternDatabase:
+    """Exact move counts for groups of tiles, ignoring every other tile, found by searching backwards from the goal.
+    Only moves of a group's own tiles are counted, so the counts of disjoint groups add up to an admissible estimate.
+    Each group takes a table of (width * height) ** len(group) bytes, which makes groups of more than 5 tiles impractical
+    """
+
+    def __init__(self, width, height, groups):
+        self.width = width
+        self.height = height
+        self.groups = [tuple(g) for g in groups]
+        self.tables = []
+        self.build_time = 0
+
+    def build(self):
+        start = time.perf_counter()
+        self.tables = [self.build_table(g) for g in self.groups]
+        self.build_time = time.perf_counter() - start
+
+    def build_table(self, group):
+        size = self.width * self.height
+        neighbours = fetch_neighbour_table(self.width, self.height, DIRECTIONS)
+        # States pack the blank and the group's positions into one integer, the blank being the lowest digit
+        weights = [size ** (i + 1) for i in range(len(group))]
+        costs = bytearray(b"\xff") * size ** (len(group) + 1)
+        goal = size - 1 + sum(w * (t - 1) for w, t in zip(weights, group))
+        costs[goal] = 0
+        # Moves of other tiles are free, so this is a 0-1 breadth first search
+        queue = deque((goal,))
+        while queue:
+            state = queue.popleft()
+            cost = costs[state]
+            blank = state % size
+            positions = [state // w % size for w in weights]
+            for n in neighbours[blank]:
+                if n in positions:
+                    i = positions.index(n)
+                    # The tile slides into the blank, which takes its place
+                    moved = state - blank + n + (blank - n) * weights[i]
+                    moved_cost = cost + 1
+                else:
+                    moved = state - blank + n
+                    moved_cost = cost
+                if moved_cost < costs[moved]:
+                    costs[moved] = moved_cost
+                    if moved_cost == cost:
+                        queue.appendleft(moved)
+                    else:
+                        queue.append(moved)
+        # Wherever the blank is, the group needs at least this many moves
+        table = bytearray(b"\xff") * size ** len(group)
+        for state in range(len(costs)):
+            cost = costs[state]
+            if cost < table[state // size]:
+                table[state // size] = cost
+        return table
+
+    def fetch_index(self, group, positions):
+        size = self.width * self.height
+        return sum(positions[t] * size ** i for i, t in enumerate(group))
+
+
+class SlideSolver:
+    """Finds the shortest sequence of slides that solves a board through IDA*.
+    Estimates are Manhattan distances plus linear conflicts, or the pattern database, whichever is larger.
+    Both are kept up to date move by move rather than recomputed for every node
+    """
+
+    def __init__(self, width, height, pattern_database=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.pattern_database = pattern_database
+        self.neighbours = fetch_neighbour_table(width, height, DIRECTIONS)
+        # distances[tile][position]
+        self.distances = [[0] * self.size] + [
+            [
+                abs(p % width - (t - 1) % width) + abs(p // width - (t - 1) // width)
+                for p in range(self.size)
+            ]
+            for t in range(1, self.size)
+        ]
+        self.nodes = 0
+        self.timed_out = False
+        self.path = []
+
+    def fetch_row_conflict(self, row):
+        start = row * self.width
+        return fetch_line_conflict(
+            [
+                (t - 1) % self.width
+                for t in self.cells[start : start + self.width]
+                if t and (t - 1) // self.width == row
+            ]
+        )
+
+    def fetch_column_conflict(self, column):
+        return fetch_line_conflict(
+            [
+                (t - 1) // self.width
+                for t in self.cells[column :: self.width]
+                if t and (t - 1) % self.width == column
+            ]
+        )
+
+    def fetch_pattern_estimate(self):
+        return sum(
+            table[i] for table, i in zip(self.pattern_tables, self.pattern_indices)
+        )
+
+    def solve(self, cells, deadline=None):
+        """Returns the positions of the tiles to slide into the blank, in order, or `None` if the deadline passed first"""
+        self.cells = list(cells)
+        self.positions = [0] * self.size
+        for i, t in enumerate(self.cells):
+            self.positions[t] = i
+        self.manhattan = sum(self.distances[t][i] for i, t in enumerate(self.cells))
+        self.row_conflicts = [self.fetch_row_conflict(r) for r in range(self.height)]
+        self.column_conflicts = [
+            self.fetch_column_conflict(c) for c in range(self.width)
+        ]
+        self.conflicts = sum(self.row_conflicts) + sum(self.column_conflicts)
+        self.pattern_tables = []
+        self.pattern_indices = []
+        # Which group, and which digit within its index, every tile belongs to
+        self.pattern_digits = {}
+        if self.pattern_database is not None:
+            self.pattern_tables = self.pattern_database.tables
+            for g, group in enumerate(self.pattern_database.groups):
+                self.pattern_indices.append(
+                    self.pattern_database.fetch_index(group, self.positions)
+                )
+                for i, t in enumerate(group):
+                    self.pattern_digits[t] = (g, self.size ** i)
+        self.deadline = deadline
+        self.nodes = 0
+        self.timed_out = False
+        self.path = []
+        bound = self.fetch_estimate()
+        while True:
+            self.next_bound = None
+            if self.search(self.positions[0], -1, 0, bound):
+                return None if self.timed_out else list(self.path)
+            if self.next_bound is None:
+                # Only possible for boards that cannot be solved
+                return None
+            bound = self.next_bound
+
+    def fetch_estimate(self):
+        estimate = self.manhattan + self.conflicts
+        if self.pattern_tables:
+            estimate = max(estimate, self.fetch_pattern_estimate())
+        return estimate
+
+    def move(self, tile_position, blank):
+        """Slides the tile at `tile_position` into the blank, updating the estimates along the way"""
+        tile = self.cells[tile_position]
+        self.cells[blank], self.cells[tile_position] = tile, 0
+        self.positions[tile], self.positions[0] = blank, tile_position
+        self.manhattan += (
+            self.distances[tile][blank] - self.distances[tile][tile_position]
+        )
+        # Only the lines the tile left and entered can have changed
+        if tile_position % self.width == blank % self.width:
+            lines, conflicts, fetch = (
+                (tile_position // self.width, blank // self.width),
+                self.row_conflicts,
+                self.fetch_row_conflict,
+            )
+        else:
+            lines, conflicts, fetch = (
+                (tile_position % self.width, blank % self.width),
+                self.column_conflicts,
+                self.fetch_column_conflict,
+            )
+        for line in lines:
+            conflict = fetch(line)
+            self.conflicts += conflict - conflicts[line]
+            conflicts[line] = conflict
+        if tile in self.pattern_digits:
+            g, weight = self.pattern_digits[tile]
+            self.pattern_indices[g] += (blank - tile_position) * weight
+
+    def search(self, blank, previous, cost, bound):
+        """Returns `True` once solved or out of time, leaving the moves in `self.path`. Tracks the smallest estimate beyond `bound` in `self.next_bound`"""
+        self.nodes += 1
+        if (
+            self.deadline is not None
+            and self.nodes % DEADLINE_CHECK_INTERVAL == 0
+            and time.perf_counter() > self.deadline
+        ):
+            self.timed_out = True
+            return True
+        estimate = self.fetch_estimate()
+        if cost + estimate > bound:
+            if self.next_bound is None or cost + estimate < self.next_bound:
+                self.next_bound = cost + estimate
+            return False
+        if self.manhattan == 0:
+            return True
+        for n in self.neighbours[blank]:
+            # Sliding the last tile straight back never helps
+            if n == previous:
+                continue
+            self.move(n, blank)
+            self.path.append(n)
+            if self.search(n, blank, cost + 1, bound):
+                return True
+            self.path.pop()
+            self.move(blank, n)
+        return False
@@ -15,21 +15,21 @@ class TextGame(ObservableGame):
     """A class designed to simplify creation of text-based games, such as hangman"""
 
     def handle_input(self, delta, input_state):
-        # We check for unicode first
-        if input_state.keypress_event is not None:
-            char = input_state.keypress_event.unicode
-            if len(char) > 0:
-                self.send_notification(EVT_UNICODE, char=char)
-
-        # Handle scrolling stuff
-        if input_state.key_pressed(pygame.K_LEFT):
-            self.send_notification(EVT_SCROLL, direction=-1)
-        elif input_state.key_pressed(pygame.K_RIGHT):
-            self.send_notification(EVT_SCROLL, direction=1)
-
-        # We also check for user wanting to submit the text
-        if input_state.key_pressed(pygame.K_RETURN):
-            self.send_notification(EVT_TEXT_SUBMIT)
+        # Fast typists fit several keys into one frame, so we go through all of them in the order they were pressed
+        for event in input_state.keypress_events:
+            # We check for unicode first
+            if len(event.unicode) > 0:
+                self.send_notification(EVT_UNICODE, char=event.unicode)
+
+            # Handle scrolling stuff
+            if event.key == pygame.K_LEFT:
+                self.send_notification(EVT_SCROLL, direction=-1)
+            elif event.key == pygame.K_RIGHT:
+                self.send_notification(EVT_SCROLL, direction=1)
+
+            # We also check for user wanting to submit the text
+            if event.key == pygame.K_RETURN:
+                self.send_notification(EVT_TEXT_SUBMIT)
 
         super().handle_input(delta, input_state)
 
@@ -0,0 +1,94 @@
+"""Runs the game without a display, sound or screen reader, driven by a script instead of a keyboard.
+Frames advance by a fixed delta as fast as they can be computed, so whole sessions play out far quicker than real time.
+The same script and seed play out the same way for games that do their work on the main loop.
+Those handing work to threads, E.G, Minesweeper's board generation or the hints of Minesweeper and CelestialSlide, depend on how quickly that work finishes, so their replays can differ
+Usage: python headless.py script.txt [seed]
+"""
+import os
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import random
+import sys
+
+import pygame
+import games
+from audio import NullSoundManager
+from context import Context
+from file_manager import FileManager
+from game_menus import MainMenu
+from keyboard import ScriptedKeyboard
+from screen import FRAME_RATE
+from screen_manager import ScreenManager
+from speech_manager import RecordingSpeech, SpeechManager
+
+# Script lines that stand for more than one frame, E.G, "wait 60"
+SCRIPT_WAIT = "wait"
+# Script lines that type text, E.G, "type hello"
+SCRIPT_TYPE = "type"
+# Joins keys pressed together, as key names may hold spaces themselves
+SCRIPT_CHORD = "+"
+
+
+def fetch_script(lines):
+    """Turns script lines into `ScriptedKeyboard` steps, one line per frame.
+    Lines hold either nothing, "wait <frames>", "type <text>", or the names of keys pressed together, as pygame knows them, joined by "+", E.G, "left shift+down"
+    """
+    script = []
+    for line in lines:
+        line = line.strip()
+        command, _, rest = line.partition(" ")
+        if not line:
+            script.append(None)
+        elif command == SCRIPT_WAIT:
+            script.extend([None] * int(rest))
+        elif command == SCRIPT_TYPE:
+            script.append(rest)
+        else:
+            try:
+                script.append(
+                    tuple(pygame.key.key_code(k) for k in line.split(SCRIPT_CHORD))
+                )
+            except ValueError:
+                raise ValueError(
+                    'The provided script line, "%s", names an unknown key' % line
+                )
+    return script
+
+
+def run(script, seed=None, delta=1 / FRAME_RATE, max_frames=None, save=False):
+    """Plays the script from the main menu until no screens remain or `max_frames` pass.
+    Returns the context, whose speech and sounds recorded the session, and the number of frames run.
+    The player's save is left alone unless `save` is set.
+    `seed` only pins down what happens on the main loop, see the module docstring
+    """
+    if seed is not None:
+        random.seed(seed)
+    pygame.init()
+    pygame.display.set_mode((720, 480))
+    sounds = NullSoundManager()
+    ctx = Context(FileManager(), sounds, SpeechManager(RecordingSpeech()))
+    ctx.load_resources()
+    sm = ScreenManager(ctx, ScriptedKeyboard(fetch_script(script)))
+    sm.add_screen(MainMenu())
+    frames = 0
+    # No ticking, I.e, the next frame starts as soon as the last is done
+    while sm.has_screens() and (max_frames is None or frames < max_frames):
+        sm.update(delta)
+        sounds.update()
+        frames += 1
+    if save:
+        ctx.export_resources()
+    ctx.free_resources()
+    pygame.quit()
+    return ctx, frames
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1]) as f:
+        ctx, frames = run(f, int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    for text in ctx.spm.output_method.fetch_text():
+        print(text)
+    print("%d frames" % frames)
@@ -1,36 +1,111 @@
 import pygame
 
+# Events kept in order for text input purposes
+KEY_EVENT_TYPES = pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT
+
 
 class Keyboard:
     def __init__(self):
-        self.current_key_presses = pygame.key.get_pressed()
+        self.current_key_presses = self.fetch_pressed()
         self.last_key_presses = self.current_key_presses
         self.quit_event = None
-        self.keypress_event = None  # Text input purposes
+        # Every key and text event of the frame, in the order they arrived
+        self.key_events = []
+        # Just the key presses among them
+        self.keypress_events = []
+        # The first of `keypress_events`, for text input purposes
+        self.keypress_event = None
+        # Keys that went down this frame, including any that were let go of before the frame ended
+        self.pressed_keys = set()
         self.events = []
 
+    def fetch_events(self):
+        return pygame.event.get()
+
+    def fetch_pressed(self):
+        return pygame.key.get_pressed()
+
     def update(self):
+        # Fetching events pumps the queue, so the pressed state read afterwards is as of the same moment
+        events = self.fetch_events()
         self.last_key_presses = self.current_key_presses
-        self.current_key_presses = pygame.key.get_pressed()
-        filtered_quit_events = pygame.event.get(eventtype=pygame.QUIT)
-        self.quit_event = (
-            None if len(filtered_quit_events) == 0 else filtered_quit_events[0]
-        )
-        filtered_keypress_events = pygame.event.get(eventtype=pygame.KEYDOWN)
-        # Pygame seems to detect keys one at a time
-        # We'll change this if it can be varified that event.get() can return multiple keys
-        self.keypress_event = (
-            None if len(filtered_keypress_events) == 0 else filtered_keypress_events[0]
-        )
-        # If needed, we'll extend this to mouse and gamepad
-        # Group anything else into `self.events`
-        self.events = pygame.event.get()
+        self.current_key_presses = self.fetch_pressed()
+        self.quit_event = None
+        self.key_events = []
+        self.events = []
+        for event in events:
+            if event.type == pygame.QUIT:
+                if self.quit_event is None:
+                    self.quit_event = event
+            elif event.type in KEY_EVENT_TYPES:
+                self.key_events.append(event)
+            else:
+                # If needed, we'll extend this to mouse and gamepad
+                # Group anything else into `self.events`
+                self.events.append(event)
+        self.keypress_events = [e for e in self.key_events if e.type == pygame.KEYDOWN]
+        self.keypress_event = self.keypress_events[0] if self.keypress_events else None
+        self.pressed_keys = {e.key for e in self.keypress_events}
 
     def key_pressed(self, key):
-        return self.current_key_presses[key] and not self.last_key_presses[key]
+        return key in self.pressed_keys or (
+            self.current_key_presses[key] and not self.last_key_presses[key]
+        )
 
     def key_held(self, key):
         return self.current_key_presses[key]
 
     def key_released(self, key):
         return not self.current_key_presses[key] and self.last_key_presses[key]
+
+
+class HeldKeys(set):
+    """Answers like `pygame.key.get_pressed` does, for keys that no real keyboard is holding"""
+
+    def __getitem__(self, key):
+        return key in self
+
+
+class ScriptedKeyboard(Keyboard):
+    """Plays back a script instead of reading the keyboard, one step per frame.
+    A step is either `None`, for a frame without input, a string, typed within the frame, or a tuple of keys pressed together.
+    Keys stay held until the next step. Once the script runs out, we ask to quit
+    """
+
+    def __init__(self, script):
+        self.script = iter(script)
+        self.held = HeldKeys()
+        self.frames = 0
+        super().__init__()
+
+    def fetch_pressed(self):
+        return HeldKeys(self.held)
+
+    def fetch_key_event(self, event_type, key, char=None):
+        if char is None:
+            # Keys outside of ascii, E.G, arrows, type nothing, whereas the likes of return and escape type their control characters
+            char = chr(key) if key < 128 else ""
+        mod = pygame.KMOD_SHIFT if self.held & {pygame.K_LSHIFT, pygame.K_RSHIFT} else 0
+        return pygame.event.Event(
+            event_type, key=key, unicode=char, mod=mod, scancode=0
+        )
+
+    def fetch_events(self):
+        events = [self.fetch_key_event(pygame.KEYUP, k) for k in self.held]
+        self.held.clear()
+        self.frames += 1
+        try:
+            step = next(self.script)
+        except StopIteration:
+            return events + [pygame.event.Event(pygame.QUIT)]
+        if isinstance(step, str):
+            for char in step:
+                key = ord(char.lower())
+                self.held.add(key)
+                events.append(self.fetch_key_event(pygame.KEYDOWN, key, char))
+                events.append(pygame.event.Event(pygame.TEXTINPUT, text=char))
+        elif step is not None:
+            for key in step:
+                self.held.add(key)
+                events.append(self.fetch_key_event(pygame.KEYDOWN, key))
+        return events
@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A bounded mapping that forgets the least recently used entry once full.
+    Keeps count of hits, misses and evictions for instrumentation purposes"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        # Lookups move entries around, so even reads need to hold this
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Forgets every entry. The counters are kept, as they describe the lifetime of the cache"""
+        with self.lock:
+            self.entries.clear()
+
+    def fetch_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0,
+        }
@@ -3,6 +3,7 @@ import os
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
 import logging
+import multiprocessing
 import synthizer
 import sys
 
@@ -59,7 +60,8 @@ def main():
     sm = ScreenManager(ctx)
     sm.add_screen(MainMenu())
     while sm.has_screens():
-        delta = c.tick(60) / 1000
+        # Menus sleep until input arrives, games tick at their own rate
+        delta = sm.wait(c)
         sm.update(delta)
         s.update()
 
@@ -68,4 +70,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Frozen builds need this before anything else for games that generate levels on a process pool
+    multiprocessing.freeze_support()
     init()
@@ -28,6 +28,8 @@ class MenuItem:
 
 
 class Menu(Screen):
+    update_rate = None
+
     def __init__(self):
         super().__init__()
         self.intro_message = ""
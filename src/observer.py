@@ -1,56 +1,119 @@
+import itertools
+import weakref
+from functools import partial
+
+
 class Observer:
     """Dummy class, mostly used to handle dynamic method dispatch."""
 
+    # (observer class, event type) -> handler function, resolved once per class
+    dispatch_table = {}
+
+    @classmethod
+    def fetch_handler(cls, attr):
+        key = (cls, attr)
+        handler = Observer.dispatch_table.get(key)
+        if handler is None:
+            handler = Observer.dispatch_table[key] = getattr(
+                cls, f"handle_{attr}", cls.handle_event
+            )
+        return handler
+
     def fetch_dynamic_attr(self, attr):
         """A wrapper testing existence of the given events and using the fallback on failure"""
-        attr_name = f"handle_{attr}"
-        if hasattr(self, attr_name):
-            return getattr(self, attr_name)
-        return self.handle_event
+        return self.fetch_handler(attr).__get__(self)
 
     def handle_event(self, *args, **kwargs):
         """Fallback for dynamic method lookup"""
         pass
 
     def notify(self, event_type, *args, **kwargs):
-        self.fetch_dynamic_attr(*args, **kwargs)
+        """Returning `True` stops the event from reaching the remaining observers of a `Subject`"""
+        handler = Observer.dispatch_table.get((type(self), event_type))
+        if handler is None:
+            handler = self.fetch_handler(event_type)
+        return handler(self, *args, **kwargs)
 
 
 class Subject:
+    """Passes events on to the observers subscribed to them, highest priority first, and in order of subscription among equals.
+    Observers are held weakly by default, so a screen that is done with need not unsubscribe to be collected.
+    If an observer returns `True` from notify, the event stops there
+    """
+
     def __init__(self):
-        # A dict of event strings and lists of observers interested in those events
+        # event -> {observer id: (priority, order, reference)}
         self.observers = {}
+        # observer id -> events it is subscribed to, so it can be removed from all of them
+        self.events = {}
+        # event -> references in dispatch order, rebuilt only after the subscriptions to that event change
+        self.snapshots = {}
+        self.counter = itertools.count()
 
-    def add_observer(self, event, obs):
-        if event not in self.observers:
-            self.observers[event] = []
-        self.observers[event].append(obs)
+    def add_observer(self, event, obs, priority=0, weak=True):
+        key = id(obs)
+        if weak:
+            # Collection drops the subscription by itself
+            reference = weakref.ref(obs, partial(self.discard, event, key))
+        else:
+            reference = partial(lambda o: o, obs)
+        self.observers.setdefault(event, {})[key] = (
+            priority,
+            next(self.counter),
+            reference,
+        )
+        self.events.setdefault(key, set()).add(event)
+        self.snapshots.pop(event, None)
 
-    def add_observer_to_events(self, events, obs):
+    def add_observer_to_events(self, events, obs, priority=0, weak=True):
         for e in events:
-            self.add_observer(e)
+            self.add_observer(e, obs, priority, weak)
 
-    # Should be changed to be noisy when handling failures
-    def remove_observer(self, event, obs):
-        if event not in self.observers or obs not in self.observers[event]:
+    def discard(self, event, key, *args):
+        """Drops a subscription by observer id, I.e, also for observers that no longer exist. Returns whether there was one"""
+        subscriptions = self.observers.get(event)
+        if subscriptions is None or subscriptions.pop(key, None) is None:
             return False
-        self.observers[event].remove(obs)
+        if not subscriptions:
+            del self.observers[event]
+        events = self.events.get(key)
+        if events is not None:
+            events.discard(event)
+            if not events:
+                del self.events[key]
+        self.snapshots.pop(event, None)
         return True
 
+    # Should be changed to be noisy when handling failures
+    def remove_observer(self, event, obs):
+        return self.discard(event, id(obs))
+
     # Should be changed to be noisy when handling failures
     def remove_observer_from_events(self, events, obs):
         return all([self.remove_observer(e, obs) for e in events])
 
-    # This isn't preferable, but will do in a pinch
-    # Ideally we'd know what the observer is listening for
     def remove_observer_from_all_events(self, obs):
-        return any([self.remove_observer(e, obs) for e in self.events])
+        events = self.events.get(id(obs), ())
+        return any([self.remove_observer(e, obs) for e in tuple(events)])
+
+    def fetch_snapshot(self, event):
+        snapshot = self.snapshots.get(event)
+        if snapshot is None:
+            subscriptions = sorted(
+                self.observers.get(event, {}).values(),
+                key=lambda s: (-s[0], s[1]),
+            )
+            snapshot = self.snapshots[event] = tuple(s[2] for s in subscriptions)
+        return snapshot
 
     def notify(self, event_type, *args, **kwargs):
-        if event_type not in self.observers:
-            return False
-        # Should probably be modified to support event propagation
-        # I.e, if a notify method returns True for a given subject, we stop at user behest
-        for o in self.observers[event_type]:
-            # An observer could be interested in multiple events
-            o.notify(event_type, *args, **kwargs)
+        """Returns whether an observer stopped the event"""
+        # Observers subscribing or leaving mid-event only take effect from the next one
+        for reference in self.fetch_snapshot(event_type):
+            obs = reference()
+            # Collected, but its callback has yet to run
+            if obs is None:
+                continue
+            if obs.notify(event_type, *args, **kwargs) is True:
+                return True
+        return False
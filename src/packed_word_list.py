@@ -0,0 +1,127 @@
+import mmap
+import struct
+from itertools import chain
+
+from word_index import WordBuckets
+
+# The file starts with the magic and the amount of blocks, followed by a directory entry per block
+# A block holds every word of a given (length, is_unique) pair, sorted, each taking exactly `length` bytes
+# Since records are fixed-width, the nth word of a block sits at offset + n * length, which is all binary search and random picks need
+MAGIC = b"AWL1"
+HEADER = struct.Struct("<4sI")
+# length, is_unique, count, offset
+DIRECTORY_ENTRY = struct.Struct("<BBIQ")
+
+
+def write_packed_word_list(rows, path):
+    """Expects an iterable of (word, length, is_unique) tuples. Words are assumed to be ascii, as `word_db_builder` ensures"""
+    blocks = {}
+    for word, length, unique in rows:
+        blocks.setdefault((length, int(unique)), []).append(word.encode("ascii"))
+    keys = sorted(blocks)
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(keys)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(keys)))
+        for length, unique in keys:
+            count = len(blocks[(length, unique)])
+            f.write(DIRECTORY_ENTRY.pack(length, unique, count, offset))
+            offset += length * count
+        for k in keys:
+            f.write(b"".join(sorted(blocks[k])))
+
+
+class PackedBlock:
+    """A read-only sequence over one block of the mapped file. Words are decoded only when asked for"""
+
+    def __init__(self, view, length, count, offset):
+        self.view = view
+        self.length = length
+        self.count = count
+        self.offset = offset
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("Packed word index out of range")
+        return self.fetch_record(i).decode("ascii")
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def __contains__(self, word):
+        """Expects the word as bytes"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self.fetch_record(mid)
+            if record < word:
+                lo = mid + 1
+            elif record > word:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def fetch_record(self, i):
+        start = self.offset + i * self.length
+        return self.view[start : start + self.length]
+
+
+class PackedWordList:
+    """A word list read straight from a memory-mapped file written by `write_packed_word_list`.
+    Answers the same questions as `WordIndex` without ever loading the words into Python objects, so only the pages we touch take up memory
+    """
+
+    def __init__(self):
+        self.file = None
+        self.view = None
+        self.blocks = {}
+        self.buckets = WordBuckets()
+
+    def __contains__(self, word):
+        try:
+            encoded = word.encode("ascii")
+        except UnicodeEncodeError:
+            return False
+        return any(
+            encoded in self.blocks[(len(encoded), u)]
+            for u in (0, 1)
+            if (len(encoded), u) in self.blocks
+        )
+
+    def __len__(self):
+        return sum(len(b) for b in self.blocks.values())
+
+    def __iter__(self):
+        return chain.from_iterable(self.blocks.values())
+
+    def open(self, path):
+        self.file = open(path, "rb")
+        self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, block_count = HEADER.unpack_from(self.view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(
+                'The provided file, "%s", is not a packed word list' % path
+            )
+        for i in range(block_count):
+            length, unique, count, offset = DIRECTORY_ENTRY.unpack_from(
+                self.view, HEADER.size + i * DIRECTORY_ENTRY.size
+            )
+            self.blocks[(length, unique)] = PackedBlock(
+                self.view, length, count, offset
+            )
+        # Blocks are sequences, so the sampler can pick from them as is
+        self.buckets.buckets = self.blocks
+
+    def close(self):
+        self.blocks = {}
+        self.buckets = WordBuckets()
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -2,9 +2,14 @@ IS_TRANSITIONING_TO_BEING_ACTIVE = 0
 IS_TRANSITIONING_TO_BEING_INACTIVE = 1
 IS_ACTIVE = 2
 IS_IDLE = 3
+# Updates per second for screens that animate or keep time
+FRAME_RATE = 60
 
 
 class Screen:
+    # Updates per second the screen needs while on top, or `None` if it only reacts to input and sounds, in which case the loop sleeps in between
+    update_rate = FRAME_RATE
+
     def __init__(self):
         self.screen_manager = None
         self.screen_status = IS_TRANSITIONING_TO_BEING_ACTIVE
@@ -1,13 +1,23 @@
 import logging
+
 from keyboard import Keyboard
-from screen import Screen, IS_ACTIVE
+from screen import (
+    Screen,
+    FRAME_RATE,
+    IS_ACTIVE,
+    IS_TRANSITIONING_TO_BEING_ACTIVE,
+    IS_TRANSITIONING_TO_BEING_INACTIVE,
+)
 
 logger = logging.getLogger(__name__)
 
+# Updates per second for screens that only react to input and sounds, low enough to idle and high enough for key presses and finished sounds to feel prompt
+IDLE_RATE = 20
+
 
 class ScreenManager:
-    def __init__(self, ctx=None):
-        self.input_state = Keyboard()
+    def __init__(self, ctx=None, input_state=None):
+        self.input_state = input_state if input_state is not None else Keyboard()
         self.screens = []
         # Screen queue is just a delayed method of pushing states
         # Since states can take time to quit, this is equivalent of "push the state onto the stack as soon as the state actually exits"
@@ -48,6 +58,24 @@ class ScreenManager:
             queued_screen = self.screen_queue.pop(0)
             self.add_screen(queued_screen)
 
+    def fetch_update_rate(self):
+        """The top screen decides, unless screens are still coming and going, which takes a few quick updates to settle"""
+        if not self.screens or self.screen_queue:
+            return FRAME_RATE
+        for s in self.screens:
+            if s.screen_status in (
+                IS_TRANSITIONING_TO_BEING_ACTIVE,
+                IS_TRANSITIONING_TO_BEING_INACTIVE,
+            ):
+                return FRAME_RATE
+        return self.screens[-1].update_rate
+
+    def wait(self, clock):
+        """Blocks until the next update is due, returning the seconds elapsed since the last one"""
+        rate = self.fetch_update_rate()
+        # Nothing is animating, so we sleep the longer between updates. Input waits on the queue meanwhile
+        return clock.tick(IDLE_RATE if rate is None else rate) / 1000
+
     def fetch_screen_from_top(self, offset):
         return self.screens[-offset]
 
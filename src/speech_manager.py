@@ -1,12 +1,30 @@
-import accessible_output2.outputs.auto
-
-
 class SpeechManager:
-    def __init__(self):
-        self.output_method = accessible_output2.outputs.auto.Auto()
+    def __init__(self, output_method=None):
+        if output_method is None:
+            # Screen readers are only needed when someone is listening, E.G, not for headless runs
+            import accessible_output2.outputs.auto
+
+            output_method = accessible_output2.outputs.auto.Auto()
+        self.output_method = output_method
 
     def output(self, text, interrupt=True):
         self.output_method.output(text, interrupt)
 
     def speak(self, text, interrupt=True):
         self.output_method.speak(text, interrupt)
+
+
+class RecordingSpeech:
+    """Takes the place of a screen reader, keeping everything said as (text, interrupt) pairs"""
+
+    def __init__(self):
+        self.transcript = []
+
+    def output(self, text, interrupt=True):
+        self.transcript.append((text, interrupt))
+
+    def speak(self, text, interrupt=True):
+        self.transcript.append((text, interrupt))
+
+    def fetch_text(self):
+        return [text for text, _ in self.transcript]
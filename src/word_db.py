@@ -1,44 +1,280 @@
-import sqlite3
+import logging
+import time
+from array import array
+from functools import partial
+
+from connection_pool import ConnectionPool
+from lru_cache import LRUCache
+from packed_word_list import PackedWordList
+from word_index import (
+    AnagramIndex,
+    PrefixIndex,
+    WordBuckets,
+    WordIndex,
+    fetch_signature,
+    fetch_sub_signatures,
+)
+from word_prefetcher import WordPrefetcher
+
+logger = logging.getLogger(__name__)
+
+# Dictates how `WordDB` answers queries
+# sqlite asks the database every time, whereas index loads every word into memory once
+# packed reads a file written by `word_db_builder pack` through mmap and never touches sqlite
+BACKEND_SQLITE = "sqlite"
+BACKEND_INDEX = "index"
+BACKEND_PACKED = "packed"
+BACKENDS = BACKEND_SQLITE, BACKEND_INDEX, BACKEND_PACKED
+# How many word_in_db answers are remembered by default
+DEFAULT_CACHE_SIZE = 4096
+# sqlite refuses statements with more than 999 parameters on older builds
+MAX_QUERY_PARAMETERS = 999
+
+# Every query we issue, kept in one place so `word_db_builder` can report on their plans
+# Those containing `%s` expect to be formatted with a list of placeholders
+QUERY_WORD_EXISTS = """SELECT EXISTS(SELECT 1 FROM words WHERE name=(? ))"""
+QUERY_WORDS_IN = """SELECT name FROM words WHERE name IN (%s)"""
+QUERY_WORDS_BY_ROWID = """SELECT rowid, name FROM words WHERE rowid IN (%s)"""
+QUERY_WORDS_BY_SIGNATURE = """SELECT name FROM words WHERE signature IN (%s)"""
+QUERY_ALL_WORDS = """SELECT name FROM words"""
+QUERY_ALL_SIGNATURES = """SELECT signature, name FROM words"""
+QUERY_INDEX_ROWS = """SELECT name, length, is_unique FROM words"""
+QUERY_BUCKET_ROWS = """SELECT rowid, length, is_unique FROM words"""
+
+
+def fetch_placeholders(amount):
+    return ", ".join("?" * amount)
 
 
 class WordDB:
-    def __init__(self):
-        self.connection = None
-        self.cursor = None
+    """Answers questions about the word list.
+    Safe to use from several threads, as every thread queries through a read-only connection of its own.
+    `load` expects a sqlite database for every backend but packed, which expects a packed word list instead
+    """
+
+    def __init__(
+        self, backend=BACKEND_SQLITE, cache_size=DEFAULT_CACHE_SIZE, cache_misses=True
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(
+                'The provided backend, "%s", is not supported. Valid options are %s'
+                % (backend, ", ".join(BACKENDS))
+            )
+        self.backend = backend
+        self.db_path = None
+        self.pool = None
+        self.index = None
+        self.buckets = None
+        self.prefix_index = None
+        self.anagram_index = None
+        self.prefetcher = None
+        # Remembers the answers sqlite gave to `word_in_db`. Resubmitted guesses and unchanged grid lines hit this rather than the database
+        # Only the sqlite backend uses it, as the others answer from memory to begin with
+        self.cache = LRUCache(cache_size)
+        # Dictates whether words that turned out not to exist are remembered too
+        self.cache_misses = cache_misses
 
     def load(self, db_path):
-        self.connection = sqlite3.connect(db_path)
-        self.cursor = self.connection.cursor()
+        # Loading again lets go of the previous database, its connections, prefetcher and cached answers included
+        if self.db_path is not None:
+            self.close()
+        self.db_path = db_path
+        if self.backend == BACKEND_PACKED:
+            start = time.perf_counter()
+            self.index = PackedWordList()
+            self.index.open(db_path)
+            logger.info(
+                "Mapped %d packed words in %.3f seconds"
+                % (len(self.index), time.perf_counter() - start)
+            )
+            self.buckets = self.index.buckets
+            return
+        self.pool = ConnectionPool(db_path)
+        if self.backend == BACKEND_INDEX:
+            self.index = WordIndex()
+            self.index.build(self.fetch_connection().execute(QUERY_INDEX_ROWS))
+            logger.info(
+                "Indexed %d words in %.3f seconds, taking up roughly %.2f MB"
+                % (
+                    len(self.index),
+                    self.index.build_time,
+                    self.index.memory_footprint / 1024 ** 2,
+                )
+            )
+            self.buckets = self.index.buckets
+        else:
+            # Keeping every word around defeats the purpose of this backend, so we settle for rowids
+            self.buckets = WordBuckets()
+            self.buckets.build(
+                self.fetch_connection().execute(QUERY_BUCKET_ROWS),
+                partial(array, "q"),
+            )
 
     def close(self):
-        self.connection.close()
-        self.connection = None
-        self.cursor = None
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            logger.info("Word prefetching stats: %s" % self.prefetcher.fetch_stats())
+            self.prefetcher = None
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        # Nothing was mapped if `load` never got that far, or this already ran
+        if self.backend == BACKEND_PACKED and self.index is not None:
+            self.index.close()
+        self.index = None
+        self.buckets = None
+        self.prefix_index = None
+        self.anagram_index = None
+        if self.backend == BACKEND_SQLITE:
+            logger.info("Word cache stats: %s" % self.cache.fetch_stats())
+        self.cache.clear()
+        self.db_path = None
+
+    def fetch_connection(self):
+        """Returns the connection of the calling thread"""
+        return self.pool.fetch_connection()
+
+    def release_connection(self):
+        """Should be called by worker threads once they are done querying"""
+        if self.pool is not None:
+            self.pool.release_connection()
 
     def word_in_db(self, word):
-        return (
-            self.cursor.execute(
-                """SELECT EXISTS(SELECT 1 FROM words WHERE name=(? ))""",
-                (word.lower(),),
-            ).fetchone()[0]
-            == 1
+        word = word.lower()
+        if self.index is not None:
+            # A lookup in memory is already cheaper than consulting the cache
+            return word in self.index
+        exists = self.cache.get(word)
+        if exists is None:
+            exists = (
+                self.fetch_connection()
+                .execute(QUERY_WORD_EXISTS, (word,))
+                .fetchone()[0]
+                == 1
+            )
+            if exists or self.cache_misses:
+                self.cache.put(word, exists)
+        return exists
+
+    def words_in_db(self, candidates):
+        """Returns the subset of `candidates` that are valid words, lowercased.
+        Meant for callers that would otherwise call `word_in_db` dozens of times per event"""
+        candidates = {c.lower() for c in candidates}
+        if self.index is not None:
+            return {c for c in candidates if c in self.index}
+        candidates = list(candidates)
+        words = set()
+        for i in range(0, len(candidates), MAX_QUERY_PARAMETERS):
+            chunk = candidates[i : i + MAX_QUERY_PARAMETERS]
+            words.update(
+                n[0]
+                for n in self.fetch_connection().execute(
+                    QUERY_WORDS_IN % fetch_placeholders(len(chunk)),
+                    chunk,
+                )
+            )
+        return words
+
+    def fetch_all_words(self):
+        if self.index is not None:
+            return iter(self.index)
+        return (n[0] for n in self.fetch_connection().execute(QUERY_ALL_WORDS))
+
+    def fetch_prefix_index(self):
+        """Builds the prefix index upon first request, as only some games need it"""
+        if self.prefix_index is None:
+            self.prefix_index = PrefixIndex(self.fetch_all_words())
+        return self.prefix_index
+
+    def has_signatures(self):
+        """Checks whether the database carries the anagram signatures generated by `word_db_builder`"""
+        return any(
+            n[1] == "signature"
+            for n in self.fetch_connection().execute("""PRAGMA table_info(words)""")
         )
 
+    def fetch_anagram_index(self):
+        if self.anagram_index is None:
+            if self.pool is not None and self.has_signatures():
+                rows = self.fetch_connection().execute(QUERY_ALL_SIGNATURES)
+            else:
+                # Packed word lists don't carry signatures, so this is only worth warning about for databases
+                if self.pool is not None:
+                    logger.warning(
+                        "The word database lacks signatures, computing them on the fly"
+                    )
+                rows = ((fetch_signature(w), w) for w in self.fetch_all_words())
+            self.anagram_index = AnagramIndex()
+            self.anagram_index.build(rows)
+        return self.anagram_index
+
+    def fetch_sub_anagrams(self, word, minimum_length=1):
+        """Returns every word that can be spelled using the letters of `word`, `word` included"""
+        word = word.lower()
+        # Databases predating `word_db_builder` have no signature column to query
+        if self.index is not None or not self.has_signatures():
+            return self.fetch_anagram_index().fetch_sub_anagrams(word, minimum_length)
+        # We let the signature index do the work rather than keeping signatures in memory
+        signatures = list(fetch_sub_signatures(word, minimum_length))
+        words = set()
+        for i in range(0, len(signatures), MAX_QUERY_PARAMETERS):
+            chunk = signatures[i : i + MAX_QUERY_PARAMETERS]
+            words.update(
+                n[0]
+                for n in self.fetch_connection().execute(
+                    QUERY_WORDS_BY_SIGNATURE % fetch_placeholders(len(chunk)),
+                    chunk,
+                )
+            )
+        return words
+
     def fetch_random_words(self, lower_bound, upper_bound, limit, is_unique=False):
         """Fetches the desired amount of words without repetition, with the given bounds, and the desired unique constraint.
         I.e, if unique is `True`, the words will not contain repeating letters"""
-        # sqlite wants integers instead of booleans. We're happy to oblige
-        unique = int(is_unique)
-        # sqlite returns a list of tuples
-        # This is true even if we sample one value from the rows
-        # So we unpack each tuple as it comes in
-        return [
-            n[0]
-            for n in self.cursor.execute(
-                """SELECT name from words WHERE length BETWEEN (?) AND (?) AND is_unique = (?) ORDER BY RANDOM() LIMIT (?)""",
-                (lower_bound, upper_bound, unique, limit),
-            )
-        ]
+        picks = self.buckets.sample(lower_bound, upper_bound, limit, is_unique)
+        if self.index is not None:
+            return picks
+        # We only have rowids, so we look the names up and restore the sampled order
+        words = dict(
+            self.fetch_connection().execute(
+                QUERY_WORDS_BY_ROWID % fetch_placeholders(len(picks)),
+                picks,
+            )
+        )
+        return [words[p] for p in picks]
 
     def fetch_random_word(self, lower_bound, upper_bound, is_unique=False):
         return self.fetch_random_words(lower_bound, upper_bound, 1, is_unique)[0]
+
+    def prefetch_words(self, lower_bound, upper_bound, is_unique=False):
+        """Starts keeping words with the given constraints ready in the background.
+        Games that fetch words mid-play should call this upon starting and `release_prefetched_words` upon ending"""
+        if self.prefetcher is None:
+            self.prefetcher = WordPrefetcher(self)
+            self.prefetcher.start()
+        self.prefetcher.register((lower_bound, upper_bound, bool(is_unique)))
+
+    def release_prefetched_words(self, lower_bound, upper_bound, is_unique=False):
+        if self.prefetcher is not None:
+            self.prefetcher.unregister((lower_bound, upper_bound, bool(is_unique)))
+
+    def fetch_prefetched_word(self, lower_bound, upper_bound, is_unique=False):
+        """Equivalent to `fetch_random_word`, but takes the word from the prefetch queue when one is ready"""
+        word = None
+        if self.prefetcher is not None:
+            word = self.prefetcher.pop((lower_bound, upper_bound, bool(is_unique)))
+        if word is None:
+            # The queue ran dry, so we pay for a query this time around
+            word = self.fetch_random_word(lower_bound, upper_bound, is_unique)
+        return word
+
+    def fetch_cache_stats(self):
+        """Only the sqlite backend caches `word_in_db`, so the others report nothing rather than a cache that never gets asked"""
+        if self.backend != BACKEND_SQLITE:
+            return {}
+        return self.cache.fetch_stats()
+
+    def fetch_prefetch_stats(self):
+        if self.prefetcher is None:
+            return {}
+        return self.prefetcher.fetch_stats()
@@ -0,0 +1,233 @@
+"""Offline steps for preparing the word database. These are ran once, before the database is shipped, and never by the game itself.
+Usage:
+python word_db_builder.py build word_list.txt [db_path]
+python word_db_builder.py signatures [db_path]
+python word_db_builder.py report [db_path]
+python word_db_builder.py pack [db_path]"""
+import argparse
+import os
+import sqlite3
+import time
+
+import word_db
+from packed_word_list import write_packed_word_list
+from word_index import fetch_signature
+
+DEFAULT_DB_PATH = "data/games/word_list.db"
+
+SCRABBLE_SCORES = {
+    **dict.fromkeys("aeilnorstu", 1),
+    **dict.fromkeys("dg", 2),
+    **dict.fromkeys("bcmp", 3),
+    **dict.fromkeys("fhvwy", 4),
+    "k": 5,
+    **dict.fromkeys("jx", 8),
+    **dict.fromkeys("qz", 10),
+}
+
+SCHEMA = """CREATE TABLE words (
+    name TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    is_unique INTEGER NOT NULL,
+    letter_mask INTEGER NOT NULL,
+    signature TEXT NOT NULL,
+    score INTEGER NOT NULL
+)"""
+# Each index notes the `WordDB` queries it serves
+INDEXES = (
+    # Membership, both single and batched. Being unique also keeps duplicates out
+    """CREATE UNIQUE INDEX words_name ON words(name)""",
+    # Covers the rowid bucket scan, which never has to touch the table as a result
+    """CREATE INDEX words_length_unique ON words(length, is_unique)""",
+    # Sub-anagram lookups
+    """CREATE INDEX words_signature ON words(signature)""",
+)
+# Sample parameters for every query `WordDB` issues, used for the report
+REPORT_QUERIES = (
+    ("word_in_db", word_db.QUERY_WORD_EXISTS, ("cat",)),
+    (
+        "words_in_db",
+        word_db.QUERY_WORDS_IN % word_db.fetch_placeholders(3),
+        ("cat", "dog", "tac"),
+    ),
+    (
+        "fetch_random_words",
+        word_db.QUERY_WORDS_BY_ROWID % word_db.fetch_placeholders(3),
+        (1, 2, 3),
+    ),
+    (
+        "fetch_sub_anagrams",
+        word_db.QUERY_WORDS_BY_SIGNATURE % word_db.fetch_placeholders(3),
+        ("act", "dgo", "aet"),
+    ),
+    ("fetch_prefix_index", word_db.QUERY_ALL_WORDS, ()),
+    ("fetch_anagram_index", word_db.QUERY_ALL_SIGNATURES, ()),
+    ("load (index backend)", word_db.QUERY_INDEX_ROWS, ()),
+    ("load (sqlite backend)", word_db.QUERY_BUCKET_ROWS, ()),
+)
+
+
+def fetch_letter_mask(word):
+    """Returns an integer with bit n set if the nth letter of the alphabet is within the word"""
+    mask = 0
+    for l in word:
+        mask |= 1 << (ord(l) - ord("a"))
+    return mask
+
+
+def fetch_word_row(word):
+    return (
+        word,
+        len(word),
+        int(len(set(word)) == len(word)),
+        fetch_letter_mask(word),
+        fetch_signature(word),
+        sum(SCRABBLE_SCORES[l] for l in word),
+    )
+
+
+def read_word_list(path):
+    """Returns the sorted, deduplicated words of a file containing a word per line.
+    Anything that isn't made of English letters exclusively is skipped, as the games have no way of typing it"""
+    with open(path, encoding="utf-8") as f:
+        words = {l.strip().lower() for l in f}
+    return sorted(w for w in words if w.isascii() and w.isalpha())
+
+
+def build(word_list_path, db_path):
+    words = read_word_list(word_list_path)
+    # We build next to the destination and swap at the end so a failure never leaves a half-built database behind
+    temp_path = db_path + ".tmp"
+    if os.path.isfile(temp_path):
+        os.remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    connection.execute(SCHEMA)
+    # Inserting in sorted order keeps rowids alphabetical, which makes for a tighter name index
+    connection.executemany(
+        """INSERT INTO words VALUES (?, ?, ?, ?, ?, ?)""",
+        (fetch_word_row(w) for w in words),
+    )
+    for index in INDEXES:
+        connection.execute(index)
+    connection.commit()
+    optimize(connection)
+    connection.close()
+    os.replace(temp_path, db_path)
+
+
+def optimize(connection):
+    """Gathers statistics for the query planner and compacts the file"""
+    connection.execute("""ANALYZE""")
+    connection.commit()
+    connection.execute("""VACUUM""")
+
+
+def add_signatures(connection):
+    """Stores the sorted letters of every word, alongside an index, so that sub-anagrams can be found without sorting the word list at runtime.
+    Meant for upgrading databases that predate `build`"""
+    columns = [n[1] for n in connection.execute("""PRAGMA table_info(words)""")]
+    if "signature" not in columns:
+        connection.execute("""ALTER TABLE words ADD COLUMN signature TEXT""")
+    connection.executemany(
+        """UPDATE words SET signature = (?) WHERE rowid = (?)""",
+        [
+            (fetch_signature(name), rowid)
+            for rowid, name in connection.execute("SELECT rowid, name FROM words")
+        ],
+    )
+    connection.execute(
+        """CREATE INDEX IF NOT EXISTS words_signature ON words(signature)"""
+    )
+    connection.commit()
+
+
+def fetch_packed_path(db_path):
+    return os.path.splitext(db_path)[0] + ".bin"
+
+
+def pack(db_path):
+    """Writes the words of the database into the format read by the packed backend, next to the database"""
+    connection = sqlite3.connect(db_path)
+    path = fetch_packed_path(db_path)
+    write_packed_word_list(connection.execute(word_db.QUERY_INDEX_ROWS), path)
+    connection.close()
+    return path
+
+
+def fetch_query_plans(connection):
+    """Returns a dictionary of `WordDB` methods and how sqlite plans to answer them"""
+    plans = {}
+    for method, query, params in REPORT_QUERIES:
+        try:
+            plans[method] = [
+                n[-1]
+                for n in connection.execute("""EXPLAIN QUERY PLAN """ + query, params)
+            ]
+        except sqlite3.OperationalError as e:
+            # Older databases may be missing columns, which is worth reporting rather than failing over
+            plans[method] = ["Unavailable: %s" % e]
+    return plans
+
+
+def fetch_report(connection):
+    lines = [
+        "%d words" % connection.execute("SELECT COUNT(*) FROM words").fetchone()[0],
+        "",
+        "Indexes:",
+    ]
+    lines.extend(
+        "  %s" % n[0]
+        for n in connection.execute(
+            """SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"""
+        )
+    )
+    lines.extend(("", "Query plans:"))
+    for method, plan in fetch_query_plans(connection).items():
+        lines.append("  %s" % method)
+        lines.extend("    %s" % n for n in plan)
+    return "\n".join(lines)
+
+
+def write_report(db_path):
+    report_path = os.path.splitext(db_path)[0] + "_report.txt"
+    connection = sqlite3.connect(db_path)
+    with open(report_path, "w") as f:
+        f.write(fetch_report(connection) + "\n")
+    connection.close()
+    return report_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepares the word database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser(
+        "build", help="Creates the database from a file with a word per line"
+    )
+    build_parser.add_argument("word_list")
+    subparsers.add_parser(
+        "signatures", help="Adds anagram signatures to an existing database"
+    )
+    subparsers.add_parser("report", help="Writes the index report only")
+    subparsers.add_parser(
+        "pack", help="Writes the packed word list used by the packed backend"
+    )
+    for p in subparsers.choices.values():
+        p.add_argument("db_path", nargs="?", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        build(args.word_list, args.db_path)
+    elif args.command == "signatures":
+        connection = sqlite3.connect(args.db_path)
+        add_signatures(connection)
+        optimize(connection)
+        connection.close()
+    elif args.command == "pack":
+        print("Packed word list written to %s" % pack(args.db_path))
+    print("Done in %.2f seconds" % (time.perf_counter() - start))
+    print("Report written to %s" % write_report(args.db_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import random
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from itertools import product
+
+
+def fetch_signature(word):
+    """Returns the letters of the word in sorted order. Two words are anagrams of one another exactly when their signatures match"""
+    return "".join(sorted(word))
+
+
+def fetch_sub_signatures(word, minimum_length=1):
+    """Yields the signature of every multiset of letters that can be made out of the word.
+    The amount of signatures is the product of (count + 1) over the distinct letters, I.E, 2 ** 15 for a 15 letter word without repeats
+    """
+    letters = sorted(Counter(word).items())
+    for counts in product(*(range(c + 1) for _, c in letters)):
+        if sum(counts) >= minimum_length:
+            yield "".join(l * c for (l, _), c in zip(letters, counts))
+
+
+class WordIndex:
+    """An in-memory membership index over the words table.
+    It is built once from the database, after which lookups never issue any queries"""
+
+    def __init__(self):
+        self.words = frozenset()
+        self.buckets = WordBuckets()
+        # Both of these are filled in by `build` and are mostly there for reporting purposes
+        self.build_time = 0
+        self.memory_footprint = 0
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def build(self, rows):
+        """Expects an iterable of (word, length, is_unique) tuples"""
+        start = time.perf_counter()
+        rows = list(rows)
+        self.words = frozenset(n[0] for n in rows)
+        # The buckets point at the same strings as the set, so they only cost us their tables
+        self.buckets.build(rows)
+        self.build_time = time.perf_counter() - start
+        # The set only accounts for its table, so we add the strings it points to
+        self.memory_footprint = (
+            sys.getsizeof(self.words)
+            + sum(sys.getsizeof(w) for w in self.words)
+            + self.buckets.memory_footprint()
+        )
+
+
+class WordBuckets:
+    """Groups values by (length, is_unique) so that random picks never need to sort the words table.
+    Values are either the words themselves or their rowids, depending on what the caller can afford to keep around"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def build(self, rows, pack=tuple):
+        """Expects an iterable of (value, length, is_unique) tuples.
+        `pack` is applied to every bucket once it is filled, E.G, to store rowids in an array"""
+        buckets = {}
+        for value, length, unique in rows:
+            buckets.setdefault((length, unique), []).append(value)
+        self.buckets = {k: pack(v) for k, v in buckets.items()}
+
+    def fetch_pools(self, lower_bound, upper_bound, is_unique):
+        unique = int(is_unique)
+        return [
+            self.buckets[(n, unique)]
+            for n in range(lower_bound, upper_bound + 1)
+            if (n, unique) in self.buckets
+        ]
+
+    def count(self, lower_bound, upper_bound, is_unique):
+        return sum(
+            len(p) for p in self.fetch_pools(lower_bound, upper_bound, is_unique)
+        )
+
+    def sample(self, lower_bound, upper_bound, limit, is_unique=False):
+        """Picks up to `limit` values without repetition in random order.
+        The cost depends on `limit` and the amount of lengths in range rather than on the size of the table"""
+        pools = self.fetch_pools(lower_bound, upper_bound, is_unique)
+        total = sum(len(p) for p in pools)
+        values = []
+        # `random.sample` never repeats an index, which is what gives us sampling without replacement
+        for i in random.sample(range(total), min(limit, total)):
+            for p in pools:
+                if i < len(p):
+                    values.append(p[i])
+                    break
+                i -= len(p)
+        return values
+
+    def memory_footprint(self):
+        return sys.getsizeof(self.buckets) + sum(
+            sys.getsizeof(b) for b in self.buckets.values()
+        )
+
+
+class PrefixIndex:
+    """Answers prefix questions about the word list, which lets callers stop scanning as soon as nothing can be spelled.
+    This acts as a trie whose nodes are ranges of a sorted tuple, so walking a letter is a pair of binary searches within the current range.
+    We do it this way because a dictionary-based trie costs an order of magnitude more memory for the same word list"""
+
+    def __init__(self, words=()):
+        self.words = tuple(sorted(words))
+
+    def __contains__(self, word):
+        i = bisect_left(self.words, word)
+        return i < len(self.words) and self.words[i] == word
+
+    def __len__(self):
+        return len(self.words)
+
+    def has_prefix(self, prefix):
+        i = bisect_left(self.words, prefix)
+        return i < len(self.words) and self.words[i].startswith(prefix)
+
+    def longest_match(self, text, start=0):
+        """Returns the length of the longest word that `text` begins with at `start`, or 0 if there is none.
+        The walk ends at the first prefix no word begins with, so characters absent from the word list, such as spaces, act as walls"""
+        lo, hi = 0, len(self.words)
+        longest = 0
+        for i in range(start, len(text)):
+            prefix = text[start : i + 1]
+            # Every word within [lo, hi) already shares `prefix` minus its last character
+            # So the words sharing all of `prefix` sit between it and its successor
+            lo = bisect_left(self.words, prefix, lo, hi)
+            hi = bisect_left(self.words, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo, hi)
+            if lo == hi:
+                break
+            if self.words[lo] == prefix:
+                longest = i + 1 - start
+        return longest
+
+
+class AnagramIndex:
+    """Maps signatures to the words spelling them, which makes listing every sub-anagram of a word a matter of lookups"""
+
+    def __init__(self):
+        self.signatures = {}
+
+    def build(self, rows):
+        """Expects an iterable of (signature, word) tuples"""
+        signatures = {}
+        for signature, word in rows:
+            signatures.setdefault(signature, []).append(word)
+        self.signatures = {k: tuple(v) for k, v in signatures.items()}
+
+    def fetch_sub_anagrams(self, word, minimum_length=1):
+        words = set()
+        for signature in fetch_sub_signatures(word, minimum_length):
+            words.update(self.signatures.get(signature, ()))
+        return words
@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class WordPrefetcher:
+    """Keeps a handful of random words ready for every (lower_bound, upper_bound, is_unique) key a game asked for.
+    Queues are refilled on a worker thread, so taking a word is a deque pop on the caller's side.
+    `lock` guards the deques and counters, as both threads change them
+    """
+
+    def __init__(self, word_db, depth=8):
+        self.word_db = word_db
+        self.depth = depth
+        self.queues = {}
+        # Keys waiting for a refill. `None` stops the worker
+        self.requests = queue.Queue()
+        # Keys already within `requests`, so that a burst of pops schedules a single refill
+        self.requested = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.underflows = 0
+        self.refills = 0
+        self.total_refill_time = 0
+        self.max_refill_time = 0
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.run, name="WordPrefetcher", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.requests.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def register(self, key):
+        with self.lock:
+            if key not in self.queues:
+                self.queues[key] = deque()
+        self.request_refill(key)
+
+    def unregister(self, key):
+        with self.lock:
+            self.queues.pop(key, None)
+
+    def request_refill(self, key):
+        with self.lock:
+            if key in self.requested:
+                return
+            self.requested.add(key)
+        self.requests.put(key)
+
+    def pop(self, key):
+        """Returns a prefetched word, or `None` if the queue ran dry"""
+        if key not in self.queues:
+            self.register(key)
+        words = self.queues[key]
+        with self.lock:
+            try:
+                word = words.popleft()
+            except IndexError:
+                self.underflows += 1
+                word = None
+            remaining = len(words)
+        if remaining < self.depth:
+            self.request_refill(key)
+        return word
+
+    def run(self):
+        while True:
+            key = self.requests.get()
+            if key is None:
+                break
+            with self.lock:
+                self.requested.discard(key)
+                words = self.queues.get(key)
+            # The game may have let go of the key while the request was waiting
+            if words is None or len(words) >= self.depth:
+                continue
+            start = time.perf_counter()
+            lower_bound, upper_bound, is_unique = key
+            fetched = self.word_db.fetch_random_words(
+                lower_bound,
+                upper_bound,
+                self.depth - len(words),
+                is_unique,
+            )
+            with self.lock:
+                # Sampling knows nothing of what is already queued, so we leave out repeats. The next pop asks for the shortfall
+                words.extend(w for w in fetched if w not in words)
+            elapsed = time.perf_counter() - start
+            self.refills += 1
+            self.total_refill_time += elapsed
+            self.max_refill_time = max(self.max_refill_time, elapsed)
+        self.word_db.release_connection()
+
+    def fetch_stats(self):
+        return {
+            "depths": {k: len(v) for k, v in self.queues.items()},
+            "underflows": self.underflows,
+            "refills": self.refills,
+            "average_refill_time": self.total_refill_time / max(self.refills, 1),
+            "max_refill_time": self.max_refill_time,
+        }